@@ -19,7 +19,7 @@ from app.services.user_service import UserService
 from app.services.cascade_deletion_service import CascadeDeletionService
 from app.schemas.sprint import SprintLightResponse
 from app.schemas.general_schemas import HttpResponseDeleteStatus
-from app.utils.calculations import calculate_sprint_metrics
+from app.utils.calculations import calculate_sprint_metrics_from_totals
 from app.models.project import ProjectTransversalActivity
 from app.api.v1.endpoints.sprints import build_user_info_response_for_sprint
 
@@ -52,8 +52,9 @@ async def build_sprint_light_response(project_id: str,
     sprints_response = []
     for s in sprints:
         s_tas = await sprint_service.get_sprint_transversal_activities_by_sprint(str(s.id))
-        s_tasks = await task_service.get_tasks_by_sprint(str(s.id))
-        sprint_metrics = await calculate_sprint_metrics(s, s_tas, s_tasks)
+        # Only the metrics are needed, the task sums are aggregated by MongoDB
+        totals = await task_service.aggregate_sprint_metrics(str(s.id))
+        sprint_metrics = calculate_sprint_metrics_from_totals(s, s_tas, totals)
         sprints_response.append(
             SprintLightResponse(
                 id=str(s.id),
@@ -13,7 +13,7 @@ from app.services.sprint_service import SprintService
 from app.services.task_service import TaskService
 from app.services.user_service import UserService
 from app.services.cascade_deletion_service import CascadeDeletionService
-from app.utils.calculations import calculate_sprint_metrics
+from app.utils.calculations import calculate_sprint_metrics, calculate_sprint_metrics_from_totals
 from app.schemas.task import TaskResponse
 from app.services.project_service import ProjectService
 from app.models.sprint import SprintTransversalActivity
@@ -300,8 +300,9 @@ async def get_sprints_light(
     sprint_responses = []
     for sprint in sprints:
         trans_acts = await sprint_service.get_sprint_transversal_activities_by_sprint(str(sprint.id), isDeleted)
-        tasks = await task_service.get_tasks_by_sprint(str(sprint.id), isDeleted)
-        sprint_metrics = await calculate_sprint_metrics(sprint, trans_acts, tasks)
+        # Only the metrics are needed, the task sums are aggregated by MongoDB
+        totals = await task_service.aggregate_sprint_metrics(str(sprint.id), isDeleted)
+        sprint_metrics = calculate_sprint_metrics_from_totals(sprint, trans_acts, totals)
         sprint_responses.append(
             SprintLightResponse(
                 id=str(sprint.id),
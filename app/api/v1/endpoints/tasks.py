@@ -1,5 +1,6 @@
 """Task API endpoints avec deliveryStatus modifié."""
 
+import mmap
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Form, UploadFile
 from math import ceil
@@ -9,14 +10,14 @@ from app.services.task_service import TaskService
 from app.services.cascade_deletion_service import CascadeDeletionService
 from app.models.task import ImportCSVResponse, SourceType, DB_FIELD_MAPPING
 from app.utils.csv_import import validate_file_and_ids, \
-    map_csv_to_tasks, build_response, process_tasks_and_duplicates, analyse_csv
+    map_csv_to_tasks, build_response, process_tasks_and_duplicates, analyse_csv, read_upload
 from app.api.deps import get_task_service, get_sprint_service, get_cascade_deletion_service
 from app.schemas.task import (
     TaskCreate, TaskUpdate, TaskResponse, HttpResponseTaskList, TaskSpecifics,
     TaskSpecificsResponse, HttpResponseTaskListResponse, TaskBase
 )
 from app.services.sprint_service import SprintService
-from app.utils.calculations import calculate_sprint_metrics
+from app.utils.calculations import calculate_sprint_metrics_from_totals
 from datetime import datetime
 from pydantic import BaseModel, Field
 from bson import ObjectId
@@ -36,12 +37,12 @@ async def build_sprint_info_response(
         if not sprint:
             return None
 
-        # Récupérer les tâches et activités transversales du sprint
-        tasks = await task_service.get_tasks_by_sprint(sprint_id)
+        # Agréger les tâches côté MongoDB et récupérer les activités transversales du sprint
+        totals = await task_service.aggregate_sprint_metrics(sprint_id)
         trans_acts = await sprint_service.get_sprint_transversal_activities_by_sprint(sprint_id)
 
         # Calculer les métriques du sprint
-        metrics = await calculate_sprint_metrics(sprint, trans_acts, tasks)
+        metrics = calculate_sprint_metrics_from_totals(sprint, trans_acts, totals)
 
         return SprintLight(
             _id=sprint_id,
@@ -334,9 +335,14 @@ async def import_csv(
     """Import tasks from a CSV file into a sprint within a project."""
     sprintId, projectId = validate_file_and_ids(file, sprintId, projectId)
     sprint = await sprint_service.get_sprint_by_id(sprintId)
-    content = await file.read()
-    df, source_type = analyse_csv(content)
-    mapped_df = map_csv_to_tasks(df, DB_FIELD_MAPPING[source_type], sprintId, projectId)
-    tasks, total_count, duplicate_keys, invalid_rows = await process_tasks_and_duplicates(mapped_df, sprint,
-                                                                                          task_service.engine)
-    return build_response(tasks, duplicate_keys, invalid_rows)
\ No newline at end of file
+    content = await read_upload(file)
+    try:
+        chunks, source_type = analyse_csv(content)
+        mapped_chunks = (map_csv_to_tasks(df, DB_FIELD_MAPPING[source_type]) for df in chunks)
+        task_ids, duplicate_keys, invalid_rows = await process_tasks_and_duplicates(mapped_chunks, sprint, projectId,
+                                                                                    task_service.engine)
+    finally:
+        # Uploads spooled to disk are memory-mapped by read_upload
+        if isinstance(content, mmap.mmap):
+            content.close()
+    return build_response(task_ids, duplicate_keys, invalid_rows)
\ No newline at end of file
@@ -123,7 +123,11 @@ class Task(Model):
 
     model_config = {
         "collection": "task",
-        "indexes": lambda: [IndexModel([("id", ASCENDING), ("is_deleted", ASCENDING)])]
+        "indexes": lambda: [
+            IndexModel([("id", ASCENDING), ("is_deleted", ASCENDING)]),
+            # Duplicate key lookup of the CSV import
+            IndexModel([("sprintId", ASCENDING), ("is_deleted", ASCENDING), ("key", ASCENDING)])
+        ]
     }
 
 
@@ -53,7 +53,7 @@ class ProjectService:
 
             for task in tasks:
                 # Recalculer les métriques avec le nouveau ratio
-                metrics = await calculate_task_metrics(task, project.transversal_vs_technical_workload_ratio)
+                metrics = calculate_task_metrics(task, project.transversal_vs_technical_workload_ratio)
 
                 # Mettre à jour les champs calculés
                 old_technical_load = task.technicalLoad
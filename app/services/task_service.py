@@ -1,6 +1,6 @@
 """Task service layer avec deliveryStatus modifié."""
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 from bson import ObjectId
 from odmantic import AIOEngine
 from fastapi import HTTPException, status
@@ -92,7 +92,7 @@ class TaskService:
             return task
 
         # Calculer les métriques
-        metrics = await calculate_task_metrics(task, project.transversal_vs_technical_workload_ratio)
+        metrics = calculate_task_metrics(task, project.transversal_vs_technical_workload_ratio)
 
         # Mettre à jour les champs calculés
         task.technicalLoad = metrics["technical_load"]
@@ -264,6 +264,46 @@ class TaskService:
             print(e)
             return []
 
+    async def aggregate_sprint_metrics(self, sprint_id: str, is_deleted: bool = False) -> Optional[Dict[str, float]]:
+        """Aggregate the task sums needed by the sprint metrics in MongoDB, without loading the tasks.
+
+        Returns None when the sprint has no tasks.
+        """
+        not_cancelled = {"$ne": ["$status", TaskStatus.CANCELLED.value]}
+        done = {"$eq": ["$status", TaskStatus.DONE.value]}
+        delivered = {"$and": [done, {"$eq": ["$deliveryStatus", TaskDeliveryStatus.OK.value]}]}
+        story_points = {"$ifNull": ["$storyPoints", 0]}
+        progress = {"$ifNull": ["$progress", 0]}
+
+        pipeline = [
+            {"$match": {"sprintId": ObjectId(sprint_id), "is_deleted": is_deleted}},
+            {"$group": {
+                "_id": None,
+                "nb_tasks": {"$sum": 1},
+                "total_time_spent": {"$sum": {"$ifNull": ["$timeSpent", 0]}},
+                "total_story_points": {"$sum": {"$cond": [not_cancelled, story_points, 0]}},
+                "progress_sp": {"$sum": {
+                    "$cond": [not_cancelled, {"$multiply": [story_points, {"$divide": [progress, 100]}]}, 0]
+                }},
+                "weighted_progress": {"$sum": {
+                    "$cond": [not_cancelled, {"$multiply": [story_points, progress]}, 0]
+                }},
+                "velocity": {"$sum": {"$cond": [done, story_points, 0]}},
+                "delivered_story_points": {"$sum": {"$cond": [
+                    {"$and": [
+                        not_cancelled,
+                        {"$in": ["$deliveryStatus", [TaskDeliveryStatus.OK.value, TaskDeliveryStatus.DEFAULT.value]]}
+                    ]},
+                    story_points,
+                    0
+                ]}},
+                "nb_task_delivered": {"$sum": {"$cond": [delivered, 1, 0]}},
+                "nb_rft_ok": {"$sum": {"$cond": [{"$and": [delivered, {"$eq": ["$rft", TASKRFT.OK.value]}]}, 1, 0]}}
+            }}
+        ]
+        results = await self.engine.get_collection(Task).aggregate(pipeline).to_list(length=1)
+        return results[0] if results else None
+
     async def get_task_type_list(self) -> dict:
         """Get all existing task types with their IDs."""
         return {
@@ -37,6 +37,18 @@ def another_object_id() -> ObjectId:
     return ObjectId()
 
 
+@pytest.fixture(scope="session")
+def _master_object_id() -> ObjectId:
+    """ObjectId partagé par les modèles de référence de la session."""
+    return ObjectId()
+
+
+@pytest.fixture(scope="session")
+def _master_another_object_id() -> ObjectId:
+    """Deuxième ObjectId partagé par les modèles de référence de la session."""
+    return ObjectId()
+
+
 @pytest.fixture
 def sample_datetime() -> datetime:
     """DateTime de référence pour les tests."""
@@ -51,11 +63,11 @@ def sample_future_datetime(sample_datetime) -> datetime:
 
 # === FIXTURES POUR LES MODÈLES ===
 
-@pytest.fixture
-def sample_service_center(valid_object_id) -> ServiceCenter:
-    """Service center de test."""
+@pytest.fixture(scope="session")
+def _sample_service_center_master(_master_object_id) -> ServiceCenter:
+    """Service center de test construit une seule fois pour la session."""
     return ServiceCenter(
-        id=valid_object_id,
+        id=_master_object_id,
         centerName="Test Center",
         location="Toulouse, France",
         contactEmail="test@sii.fr",
@@ -70,11 +82,23 @@ def sample_service_center(valid_object_id) -> ServiceCenter:
 
 
 @pytest.fixture
-def sample_project(valid_object_id, another_object_id) -> Project:
-    """Projet de test."""
+def sample_service_center(_sample_service_center_master) -> ServiceCenter:
+    """Service center de test (copie propre à chaque test)."""
+    return _sample_service_center_master.model_copy(deep=True)
+
+
+@pytest.fixture(scope="session")
+def sample_service_center_id(_sample_service_center_master) -> str:
+    """ID du service center de test sous forme de chaîne, calculé une seule fois."""
+    return str(_sample_service_center_master.id)
+
+
+@pytest.fixture(scope="session")
+def _sample_project_master(_master_object_id, _master_another_object_id) -> Project:
+    """Projet de test construit une seule fois pour la session."""
     return Project(
-        id=valid_object_id,
-        centerId=another_object_id,
+        id=_master_object_id,
+        centerId=_master_another_object_id,
         projectName="Test Project",
         status=ProjectStatus.INPROGRESS,
         sprints=[],
@@ -86,6 +110,18 @@ def sample_project(valid_object_id, another_object_id) -> Project:
     )
 
 
+@pytest.fixture
+def sample_project(_sample_project_master) -> Project:
+    """Projet de test (copie propre à chaque test)."""
+    return _sample_project_master.model_copy(deep=True)
+
+
+@pytest.fixture(scope="session")
+def sample_project_id(_sample_project_master) -> str:
+    """ID du projet de test sous forme de chaîne, calculé une seule fois."""
+    return str(_sample_project_master.id)
+
+
 @pytest.fixture
 def sample_sprint(valid_object_id, another_object_id, sample_datetime, sample_future_datetime) -> Sprint:
     """Sprint de test."""
@@ -131,11 +167,11 @@ def sample_task(valid_object_id, another_object_id) -> Task:
     )
 
 
-@pytest.fixture
-def sample_user(valid_object_id) -> User:
-    """Utilisateur de test."""
+@pytest.fixture(scope="session")
+def _sample_user_master(_master_object_id) -> User:
+    """Utilisateur de test construit une seule fois pour la session."""
     return User(
-        id=valid_object_id,
+        id=_master_object_id,
         first_name="John",
         family_name="Doe",
         email="john.doe@sii.fr",
@@ -147,6 +183,18 @@ def sample_user(valid_object_id) -> User:
     )
 
 
+@pytest.fixture
+def sample_user(_sample_user_master) -> User:
+    """Utilisateur de test (copie propre à chaque test)."""
+    return _sample_user_master.model_copy(deep=True)
+
+
+@pytest.fixture(scope="session")
+def sample_user_id(_sample_user_master) -> str:
+    """ID de l'utilisateur de test sous forme de chaîne, calculé une seule fois."""
+    return str(_sample_user_master.id)
+
+
 @pytest.fixture
 def sample_project_transversal_activity(valid_object_id, another_object_id) -> ProjectTransversalActivity:
     """Activité transversale de projet de test."""
@@ -171,23 +219,29 @@ def sample_sprint_transversal_activity(valid_object_id, another_object_id) -> Sp
     )
 
 
-@pytest.fixture
-def sample_director_access(valid_object_id, another_object_id) -> DirectorAccess:
-    """Accès directeur de test."""
+@pytest.fixture(scope="session")
+def _sample_director_access_master(_master_object_id, _master_another_object_id) -> DirectorAccess:
+    """Accès directeur de test construit une seule fois pour la session."""
     return DirectorAccess(
-        id=valid_object_id,
-        user_id=another_object_id,
+        id=_master_object_id,
+        user_id=_master_another_object_id,
         service_center_id=ObjectId(),
         service_center_name="Test Center"
     )
 
 
 @pytest.fixture
-def sample_project_access(valid_object_id, another_object_id) -> ProjectAccess:
-    """Accès projet de test."""
+def sample_director_access(_sample_director_access_master) -> DirectorAccess:
+    """Accès directeur de test (copie propre à chaque test)."""
+    return _sample_director_access_master.model_copy(deep=True)
+
+
+@pytest.fixture(scope="session")
+def _sample_project_access_master(_master_object_id, _master_another_object_id) -> ProjectAccess:
+    """Accès projet de test construit une seule fois pour la session."""
     return ProjectAccess(
-        id=valid_object_id,
-        user_id=another_object_id,
+        id=_master_object_id,
+        user_id=_master_another_object_id,
         service_center_id=ObjectId(),
         service_center_name="Test Center",
         project_id=ObjectId(),
@@ -197,6 +251,12 @@ def sample_project_access(valid_object_id, another_object_id) -> ProjectAccess:
     )
 
 
+@pytest.fixture
+def sample_project_access(_sample_project_access_master) -> ProjectAccess:
+    """Accès projet de test (copie propre à chaque test)."""
+    return _sample_project_access_master.model_copy(deep=True)
+
+
 # === FIXTURES POUR LES LISTES ===
 
 @pytest.fixture
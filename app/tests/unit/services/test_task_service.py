@@ -1,13 +1,42 @@
 """Tests unitaires pour TaskService."""
 
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from bson import ObjectId
 from fastapi import HTTPException
 
 from app.models.task import Task, TaskStatus, TaskType, TASKRFT, TaskDeliveryStatus
 from app.models.project import Project
+from app.models.sprint import SprintStatus
 from app.schemas.task import TaskCreate, TaskUpdate
+from app.utils.calculations import calculate_sprint_metrics, calculate_sprint_metrics_from_totals
+
+
+def _evaluate(expression, doc):
+    """Évalue une expression d'agrégation MongoDB (opérateurs du pipeline des métriques) sur un document."""
+    if isinstance(expression, str) and expression.startswith("$"):
+        return doc.get(expression[1:])
+    if not isinstance(expression, dict):
+        return expression
+    (operator, args), = expression.items()
+    values = [_evaluate(arg, doc) for arg in args]
+    if operator == "$ifNull":
+        return values[0] if values[0] is not None else values[1]
+    if operator == "$cond":
+        return values[1] if values[0] else values[2]
+    if operator == "$and":
+        return all(values)
+    if operator == "$eq":
+        return values[0] == values[1]
+    if operator == "$ne":
+        return values[0] != values[1]
+    if operator == "$in":
+        return values[0] in values[1]
+    if operator == "$multiply":
+        return values[0] * values[1]
+    if operator == "$divide":
+        return values[0] / values[1]
+    raise NotImplementedError(operator)
 
 
 class TestTaskServiceValidation:
@@ -272,6 +301,80 @@ class TestTaskServiceRead:
         # Assert
         assert result == []
 
+    @pytest.mark.asyncio
+    async def test_aggregate_sprint_metrics(self, task_service, sample_sprint):
+        """Test agrégation des métriques d'un sprint côté MongoDB."""
+        # Arrange
+        totals = {"_id": None, "nb_tasks": 2, "velocity": 8.0}
+        cursor = MagicMock()
+        cursor.to_list = AsyncMock(return_value=[totals])
+        task_service.engine.get_collection = MagicMock(return_value=MagicMock(aggregate=MagicMock(return_value=cursor)))
+
+        # Act
+        result = await task_service.aggregate_sprint_metrics(str(sample_sprint.id))
+
+        # Assert
+        assert result == totals
+        pipeline = task_service.engine.get_collection.return_value.aggregate.call_args.args[0]
+        assert pipeline[0] == {"$match": {"sprintId": sample_sprint.id, "is_deleted": False}}
+
+    @pytest.mark.asyncio
+    async def test_aggregate_sprint_metrics_empty(self, task_service, sample_sprint):
+        """Test agrégation des métriques d'un sprint sans tâche."""
+        # Arrange
+        cursor = MagicMock()
+        cursor.to_list = AsyncMock(return_value=[])
+        task_service.engine.get_collection = MagicMock(return_value=MagicMock(aggregate=MagicMock(return_value=cursor)))
+
+        # Act
+        result = await task_service.aggregate_sprint_metrics(str(sample_sprint.id))
+
+        # Assert
+        assert result is None
+
+    @pytest.mark.asyncio
+    async def test_aggregate_sprint_metrics_group_stage(self, task_service, sample_sprint, another_object_id):
+        """Test le $group du pipeline donne les mêmes sommes que le calcul en mémoire des métriques."""
+        # Arrange
+        sample_sprint.status = SprintStatus.DONE
+        task_data = {"sprintId": sample_sprint.id, "projectId": another_object_id, "summary": "Test"}
+        tasks = [
+            Task(key="T-1", status=TaskStatus.DONE, deliveryStatus=TaskDeliveryStatus.OK, rft=TASKRFT.OK,
+                 storyPoints=5.0, progress=100.0, timeSpent=2.0, **task_data),
+            Task(key="T-2", status=TaskStatus.CANCELLED, storyPoints=3.0, progress=50.0, timeSpent=1.0, **task_data),
+            Task(key="T-3", status=TaskStatus.TODO, storyPoints=8.0, progress=None, **task_data),
+            Task(key="T-4", status=TaskStatus.INPROGRESS, deliveryStatus=TaskDeliveryStatus.KO, storyPoints=0.0,
+                 timeSpent=None, **task_data),
+        ]
+        docs = [task.model_dump_doc() for task in tasks]
+        docs[3]["storyPoints"] = None  # Document incomplet en base, compté comme 0 SP
+        cursor = MagicMock()
+        cursor.to_list = AsyncMock(return_value=[])
+        task_service.engine.get_collection = MagicMock(return_value=MagicMock(aggregate=MagicMock(return_value=cursor)))
+
+        # Act
+        await task_service.aggregate_sprint_metrics(str(sample_sprint.id))
+        pipeline = task_service.engine.get_collection.return_value.aggregate.call_args.args[0]
+        group = pipeline[1]["$group"]
+        totals = {name: sum(_evaluate(accumulator["$sum"], doc) for doc in docs)
+                  for name, accumulator in group.items() if name != "_id"}
+
+        # Assert
+        assert len(pipeline) == 2 and group["_id"] is None
+        assert totals == {
+            "nb_tasks": 4,
+            "total_time_spent": 3.0,
+            "total_story_points": 13.0,
+            "progress_sp": 5.0,
+            "weighted_progress": 500.0,
+            "velocity": 5.0,
+            "delivered_story_points": 13.0,
+            "nb_task_delivered": 1,
+            "nb_rft_ok": 1
+        }
+        assert calculate_sprint_metrics_from_totals(sample_sprint, [], totals) == \
+            await calculate_sprint_metrics(sample_sprint, [], tasks)
+
 
 class TestTaskServiceUpdate:
     """Tests pour la mise à jour de tâches."""
@@ -1,7 +1,8 @@
 """Tests unitaires pour UserService."""
 
 import pytest
-from unittest.mock import AsyncMock, patch
+from collections import namedtuple
+from unittest.mock import AsyncMock, Mock, patch
 from bson import ObjectId
 from fastapi import HTTPException
 
@@ -12,6 +13,21 @@ from app.schemas.user import (
     UserCreate, UserLite, DirectorAccessBase, ProjectAccessBase
 )
 
+# Utilisateur factice pour les tests qui n'inspectent jamais ses champs
+_DUMMY_USER = Mock(spec=User)
+
+# Centre de service minimal quand seuls l'ID et le nom sont lus
+_SCStub = namedtuple("_SCStub", ["id", "centerName"])
+
+
+async def assert_http_error(coro_factory, status_code, detail_substr):
+    """Vérifie que la coroutine lève une HTTPException avec le code et le détail attendus."""
+    with pytest.raises(HTTPException) as exc_info:
+        await coro_factory()
+
+    assert exc_info.value.status_code == status_code
+    assert detail_substr in exc_info.value.detail
+
 
 class TestUserServiceCreate:
     """Tests pour la création d'utilisateurs."""
@@ -41,7 +57,7 @@ class TestUserServiceCreate:
         assert result.trigram == user_data.trigram
         assert result.director_access_list == []
         assert result.project_access_list == []
-        user_service.engine.save.assert_called_once()
+        assert user_service.engine.save.call_count == 1
 
     @pytest.mark.asyncio
     async def test_create_user_minimal_data(self, user_service):
@@ -62,7 +78,7 @@ class TestUserServiceCreate:
         assert result.family_name == "Smith"
         assert result.type == UserTypeEnum.NORMAL
         assert result.registration_number == ""
-        user_service.engine.save.assert_called_once()
+        assert user_service.engine.save.call_count == 1
 
     @pytest.mark.asyncio
     async def test_create_user_database_error(self, user_service):
@@ -77,28 +93,24 @@ class TestUserServiceCreate:
         user_service.engine.save.side_effect = Exception("Database error")
 
         # Act & Assert
-        with pytest.raises(HTTPException) as exc_info:
-            await user_service.create_user(user_data)
-
-        assert exc_info.value.status_code == 400
-        assert "Error creating user" in exc_info.value.detail
+        await assert_http_error(lambda: user_service.create_user(user_data), 400, "Error creating user")
 
 
 class TestUserServiceRead:
     """Tests pour la lecture d'utilisateurs."""
 
     @pytest.mark.asyncio
-    async def test_get_user_by_id_success(self, user_service, sample_user):
+    async def test_get_user_by_id_success(self, user_service, sample_user, sample_user_id):
         """Test récupération réussie d'un utilisateur par ID."""
         # Arrange
         user_service.engine.find_one.return_value = sample_user
 
         # Act
-        result = await user_service.get_user_by_id(str(sample_user.id))
+        result = await user_service.get_user_by_id(sample_user_id)
 
         # Assert
         assert result == sample_user
-        user_service.engine.find_one.assert_called_once()
+        assert user_service.engine.find_one.call_count == 1
 
     @pytest.mark.asyncio
     async def test_get_user_by_id_not_found(self, user_service, nonexistent_object_id):
@@ -122,10 +134,10 @@ class TestUserServiceRead:
         assert result is None
 
     @pytest.mark.asyncio
-    async def test_get_users_by_ids_success(self, user_service, sample_user):
+    async def test_get_users_by_ids_success(self, user_service, sample_user, sample_user_id):
         """Test récupération de plusieurs utilisateurs par IDs."""
         # Arrange
-        user_ids = [str(sample_user.id)]
+        user_ids = [sample_user_id]
         user_service.engine.find.return_value = [sample_user]
 
         # Act
@@ -134,7 +146,7 @@ class TestUserServiceRead:
         # Assert
         assert len(result) == 1
         assert result[0] == sample_user
-        user_service.engine.find.assert_called_once()
+        assert user_service.engine.find.call_count == 1
 
     @pytest.mark.asyncio
     async def test_get_users_by_ids_empty_list(self, user_service):
@@ -149,85 +161,52 @@ class TestUserServiceRead:
         assert result == []
 
     @pytest.mark.asyncio
-    async def test_get_users_with_pagination(self, user_service, sample_user):
-        """Test récupération avec pagination."""
-        # Arrange
-        users_list = [sample_user]
-        user_service.engine.find.return_value = users_list
-        user_service.engine.count.return_value = 1
-
-        # Act
-        users, total = await user_service.get_users(skip=0, limit=10)
-
-        # Assert
-        assert len(users) == 1
-        assert total == 1
-        assert users[0] == sample_user
-
-    @pytest.mark.asyncio
-    async def test_get_users_with_name_filter(self, user_service, sample_user):
-        """Test récupération avec filtre de nom."""
+    @pytest.mark.parametrize("method, args", [
+        ("get_users", {"skip": 0, "limit": 10}),
+        ("get_users", {"name_substring": "John"}),
+        ("get_users_by_name", ("John",)),
+        ("get_users_by_name", ()),
+    ], ids=["pagination", "name_filter", "by_name", "by_name_no_substring"])
+    async def test_get_users_variants(self, user_service, sample_user, method, args):
+        """Test récupération d'utilisateurs avec pagination et filtres de nom."""
         # Arrange
         user_service.engine.find.return_value = [sample_user]
         user_service.engine.count.return_value = 1
+        func = getattr(user_service, method)
 
         # Act
-        users, total = await user_service.get_users(name_substring="John")
+        result = await (func(**args) if isinstance(args, dict) else func(*args))
 
         # Assert
-        assert len(users) == 1
-        assert total == 1
-        user_service.engine.find.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_get_users_by_name_success(self, user_service, sample_user):
-        """Test récupération d'utilisateurs par nom."""
-        # Arrange
-        user_service.engine.find.return_value = [sample_user]
-        user_service.engine.count.return_value = 1
-
-        # Act
-        result = await user_service.get_users_by_name("John")
-
-        # Assert
-        assert len(result) == 1
-        assert result[0] == sample_user
-
-    @pytest.mark.asyncio
-    async def test_get_users_by_name_no_substring(self, user_service, sample_user):
-        """Test récupération sans substring."""
-        # Arrange
-        user_service.engine.find.return_value = [sample_user]
-        user_service.engine.count.return_value = 1
-
-        # Act
-        result = await user_service.get_users_by_name()
-
-        # Assert
-        assert len(result) == 1
+        if isinstance(result, tuple):
+            result, total = result
+            assert total == 1
+        assert result == [sample_user]
+        assert user_service.engine.find.call_count == 1
 
 
 class TestUserServiceUpdate:
     """Tests pour la mise à jour d'utilisateurs."""
 
     @pytest.mark.asyncio
-    async def test_update_user_lite_success(self, user_service, sample_user, sample_service_center):
+    async def test_update_user_lite_success(self, user_service, sample_user, sample_user_id):
         """Test mise à jour réussie avec UserLite."""
         # Arrange
+        service_center = _SCStub(id=ObjectId(), centerName="Test Center")
         user_service.engine.find_one.side_effect = [
             sample_user,  # get_user_by_id
-            sample_service_center  # _get_service_center_name
+            service_center  # _get_service_center_name
         ]
 
         user_lite = UserLite(
-            id=str(sample_user.id),
+            id=sample_user_id,
             firstName="John Updated",
             familyName="Doe Updated",
             email="john.updated@sii.fr",
             type=UserTypeEnum.ADMIN,
             registrationNumber="789123",
             trigram="JUD",
-            directorAccessList=[DirectorAccessBase(serviceCenterId=str(sample_service_center.id))],
+            directorAccessList=[DirectorAccessBase(serviceCenterId=str(service_center.id))],
             projectAccessList=[]
         )
 
@@ -241,8 +220,8 @@ class TestUserServiceUpdate:
                 assert result.family_name == "Doe Updated"
                 assert result.email == "john.updated@sii.fr"
                 assert result.type == UserTypeEnum.ADMIN
-                mock_director.assert_called_once()
-                mock_project.assert_called_once()
+                assert mock_director.call_count == 1
+                assert mock_project.call_count == 1
                 user_service.engine.save.assert_called()
 
     @pytest.mark.asyncio
@@ -266,13 +245,13 @@ class TestUserServiceUpdate:
         assert result is None
 
     @pytest.mark.asyncio
-    async def test_update_user_lite_with_access_management(self, user_service, sample_user):
+    async def test_update_user_lite_with_access_management(self, user_service, sample_user, sample_user_id):
         """Test mise à jour avec gestion des accès."""
         # Arrange
         user_service.engine.find_one.return_value = sample_user
 
         user_lite = UserLite(
-            id=str(sample_user.id),
+            id=sample_user_id,
             firstName="John",
             familyName="Doe",
             email="john.doe@sii.fr",
@@ -295,19 +274,19 @@ class TestUserServiceDelete:
     """Tests pour la suppression d'utilisateurs."""
 
     @pytest.mark.asyncio
-    async def test_delete_user_success(self, user_service, sample_user):
+    async def test_delete_user_success(self, user_service, sample_user, sample_user_id):
         """Test suppression réussie d'un utilisateur."""
         # Arrange
         user_service.engine.find_one.return_value = sample_user
         sample_user.is_deleted = False
 
         # Act
-        result = await user_service.delete_user(str(sample_user.id))
+        result = await user_service.delete_user(sample_user_id)
 
         # Assert
         assert result is True
         assert sample_user.is_deleted is True
-        user_service.engine.save.assert_called_once()
+        assert user_service.engine.save.call_count == 1
 
     @pytest.mark.asyncio
     async def test_delete_user_not_found(self, user_service, nonexistent_object_id):
@@ -316,45 +295,41 @@ class TestUserServiceDelete:
         user_service.engine.find_one.return_value = None
 
         # Act & Assert
-        with pytest.raises(HTTPException) as exc_info:
-            await user_service.delete_user(nonexistent_object_id)
-
-        assert exc_info.value.status_code == 404
-        assert "not found" in exc_info.value.detail
+        await assert_http_error(lambda: user_service.delete_user(nonexistent_object_id), 404, "not found")
 
 
 class TestUserServiceAccessManagement:
     """Tests pour la gestion des accès."""
 
     @pytest.mark.asyncio
-    async def test_get_director_access_by_user_success(self, user_service, sample_user, sample_director_access):
+    async def test_get_director_access_by_user_success(self, user_service, sample_user_id, sample_director_access):
         """Test récupération des accès directeur par utilisateur."""
         # Arrange
         user_service.engine.find.return_value = [sample_director_access]
         user_service._get_service_center_name = AsyncMock(return_value="Test Center")
 
         # Act
-        result = await user_service.get_director_access_by_user(str(sample_user.id))
+        result = await user_service.get_director_access_by_user(sample_user_id)
 
         # Assert
         assert len(result) == 1
         assert result[0] == sample_director_access
-        user_service.engine.find.assert_called_once()
+        assert user_service.engine.find.call_count == 1
 
     @pytest.mark.asyncio
-    async def test_get_director_access_by_user_empty(self, user_service, sample_user):
+    async def test_get_director_access_by_user_empty(self, user_service, sample_user_id):
         """Test récupération sans accès directeur."""
         # Arrange
         user_service.engine.find.return_value = []
 
         # Act
-        result = await user_service.get_director_access_by_user(str(sample_user.id))
+        result = await user_service.get_director_access_by_user(sample_user_id)
 
         # Assert
         assert result == []
 
     @pytest.mark.asyncio
-    async def test_get_project_access_by_user_success(self, user_service, sample_user, sample_project_access):
+    async def test_get_project_access_by_user_success(self, user_service, sample_user_id, sample_project_access):
         """Test récupération des accès projet par utilisateur."""
         # Arrange
         user_service.engine.find.return_value = [sample_project_access]
@@ -362,15 +337,15 @@ class TestUserServiceAccessManagement:
         user_service._get_project_name = AsyncMock(return_value="Test Project")
 
         # Act
-        result = await user_service.get_project_access_by_user(str(sample_user.id))
+        result = await user_service.get_project_access_by_user(sample_user_id)
 
         # Assert
         assert len(result) == 1
         assert result[0] == sample_project_access
-        user_service.engine.find.assert_called_once()
+        assert user_service.engine.find.call_count == 1
 
     @pytest.mark.asyncio
-    async def test_get_project_accesses_by_project_success(self, user_service, sample_project, sample_project_access):
+    async def test_get_project_accesses_by_project_success(self, user_service, sample_project_id, sample_project_access):
         """Test récupération des accès projet par projet."""
         # Arrange
         user_service.engine.find.return_value = [sample_project_access]
@@ -378,28 +353,28 @@ class TestUserServiceAccessManagement:
         user_service._get_project_name = AsyncMock(return_value="Test Project")
 
         # Act
-        result = await user_service.get_project_accesses_by_project(str(sample_project.id))
+        result = await user_service.get_project_accesses_by_project(sample_project_id)
 
         # Assert
         assert len(result) == 1
         assert result[0] == sample_project_access
 
     @pytest.mark.asyncio
-    async def test_get_director_accesses_by_service_center_success(self, user_service, sample_service_center, sample_director_access):
+    async def test_get_director_accesses_by_service_center_success(self, user_service, sample_service_center_id, sample_director_access):
         """Test récupération des accès directeur par centre de service."""
         # Arrange
         user_service.engine.find.return_value = [sample_director_access]
         user_service._get_service_center_name = AsyncMock(return_value="Test Center")
 
         # Act
-        result = await user_service.get_director_accesses_by_service_center(str(sample_service_center.id))
+        result = await user_service.get_director_accesses_by_service_center(sample_service_center_id)
 
         # Assert
         assert len(result) == 1
         assert result[0] == sample_director_access
 
     @pytest.mark.asyncio
-    async def test_get_project_accesses_by_service_center_success(self, user_service, sample_service_center, sample_project_access):
+    async def test_get_project_accesses_by_service_center_success(self, user_service, sample_service_center_id, sample_project_access):
         """Test récupération des accès projet par centre de service."""
         # Arrange
         user_service.engine.find.return_value = [sample_project_access]
@@ -407,7 +382,7 @@ class TestUserServiceAccessManagement:
         user_service._get_project_name = AsyncMock(return_value="Test Project")
 
         # Act
-        result = await user_service.get_project_accesses_by_service_center(str(sample_service_center.id))
+        result = await user_service.get_project_accesses_by_service_center(sample_service_center_id)
 
         # Assert
         assert len(result) == 1
@@ -497,26 +472,18 @@ class TestUserServiceUtilityMethods:
         assert result[0].project_name == "Updated Project Name"
 
 
-class TestUserServiceFieldMapping:
-    """Tests pour le mapping des champs."""
-
-    def test_map_camelcase_to_snake_success(self, user_service):
-        """Test mapping CamelCase vers snake_case."""
-        # Arrange
-        user_data = UserCreate(
+@pytest.mark.parametrize("method, payload, expected", [
+    (
+        "_map_camelcase_to_snake",
+        UserCreate(
             firstName="Test",
             familyName="User",
             email="test@sii.fr",
             type=UserTypeEnum.NORMAL,
             registrationNumber="123",
             trigram="TST"
-        )
-
-        # Act
-        result = user_service._map_camelcase_to_snake(user_data)
-
-        # Assert
-        expected = {
+        ),
+        {
             'first_name': 'Test',
             'family_name': 'User',
             'email': 'test@sii.fr',
@@ -526,24 +493,17 @@ class TestUserServiceFieldMapping:
             'director_access_list': [],
             'project_access_list': []
         }
-        assert result == expected
-
-    def test_map_user_lite_to_snake_success(self, user_service, valid_object_id):
-        """Test mapping UserLite vers snake_case."""
-        # Arrange
-        user_lite = UserLite(
-            id=str(valid_object_id),
+    ),
+    (
+        "_map_user_lite_to_snake",
+        UserLite(
+            id=str(ObjectId()),
             firstName="Test",
             familyName="User",
             email="test@sii.fr",
             trigram="TST"
-        )
-
-        # Act
-        result = user_service._map_user_lite_to_snake(user_lite)
-
-        # Assert
-        expected = {
+        ),
+        {
             'first_name': 'Test',
             'family_name': 'User',
             'email': 'test@sii.fr',
@@ -551,73 +511,98 @@ class TestUserServiceFieldMapping:
             'registration_number': '',
             'trigram': 'TST'
         }
-        assert result == expected
+    ),
+])
+def test_mapping(user_service, method, payload, expected):
+    """Test mapping des schémas CamelCase vers les champs snake_case."""
+    assert getattr(user_service, method)(payload) == expected
+
+
+def _async_returning(value):
+    """AsyncMock renvoyant toujours la même valeur."""
+    return AsyncMock(return_value=value)
+
+
+@pytest.fixture
+def configured_service(user_service, request):
+    """UserService dont l'engine et les helpers de noms sont configurés via request.param.
+
+    Les valeurs de "find" et "find_one" sont des noms de fixtures, résolus à la demande.
+    """
+    cfg = request.param
+    user_service.engine.find.return_value = [request.getfixturevalue(name) for name in cfg.get("find", [])]
+    find_one = cfg.get("find_one")
+    user_service.engine.find_one.return_value = request.getfixturevalue(find_one) if find_one else None
+    for name, value in cfg.get("stubs", {}).items():
+        setattr(user_service, name, _async_returning(value))
+    return user_service
 
 
 class TestUserServiceAccessIdLogic:
     """Tests pour la logique de gestion des accès avec IDs."""
 
     @pytest.mark.asyncio
-    async def test_manage_director_accesses_with_new_access(self, user_service, sample_user, sample_service_center):
+    @pytest.mark.parametrize("configured_service", [
+        {"stubs": {"_get_service_center_name": "Test Center"}}
+    ], indirect=True)
+    async def test_manage_director_accesses_with_new_access(self, configured_service, sample_user, sample_service_center_id):
         """Test gestion des accès directeur avec nouvel accès."""
         # Arrange
-        user_service.engine.find.return_value = []  # Pas d'accès existant
-        user_service._get_service_center_name = AsyncMock(return_value="Test Center")
-
-        director_accesses = [DirectorAccessBase(serviceCenterId=str(sample_service_center.id))]
+        director_accesses = [DirectorAccessBase(serviceCenterId=sample_service_center_id)]
 
         # Act
-        await user_service._manage_director_accesses_with_id_logic(sample_user, director_accesses)
+        await configured_service._manage_director_accesses_with_id_logic(sample_user, director_accesses)
 
         # Assert
-        user_service.engine.save.assert_called()  # Pour créer le nouvel accès
+        configured_service.engine.save.assert_called()  # Pour créer le nouvel accès
 
     @pytest.mark.asyncio
-    async def test_manage_director_accesses_with_existing_access(self, user_service, sample_user, sample_director_access):
+    @pytest.mark.parametrize("configured_service", [
+        {
+            "find": ["sample_director_access"],
+            "find_one": "sample_director_access",
+            "stubs": {"_get_service_center_name": "Updated Center"}
+        }
+    ], indirect=True)
+    async def test_manage_director_accesses_with_existing_access(self, configured_service, sample_user, sample_director_access):
         """Test gestion des accès directeur avec mise à jour d'un accès existant."""
         # Arrange
-        user_service.engine.find_one.return_value = sample_director_access
-        user_service.engine.find.return_value = [sample_director_access]
-        user_service._get_service_center_name = AsyncMock(return_value="Updated Center")
-
         director_accesses = [DirectorAccessBase(
             id=str(sample_director_access.id),
             serviceCenterId=str(sample_director_access.service_center_id)
         )]
 
         # Act
-        await user_service._manage_director_accesses_with_id_logic(sample_user, director_accesses)
+        await configured_service._manage_director_accesses_with_id_logic(sample_user, director_accesses)
 
         # Assert
-        user_service.engine.save.assert_called()  # Pour mettre à jour l'accès
+        configured_service.engine.save.assert_called()  # Pour mettre à jour l'accès
 
     @pytest.mark.asyncio
-    async def test_manage_project_accesses_with_new_access(self, user_service, sample_user, sample_service_center, sample_project):
+    @pytest.mark.parametrize("configured_service", [
+        {"stubs": {"_get_service_center_name": "Test Center", "_get_project_name": "Test Project"}}
+    ], indirect=True)
+    async def test_manage_project_accesses_with_new_access(self, configured_service, sample_user, sample_service_center_id, sample_project_id):
         """Test gestion des accès projet avec nouvel accès."""
         # Arrange
-        user_service.engine.find.return_value = []  # Pas d'accès existant
-        user_service._get_service_center_name = AsyncMock(return_value="Test Center")
-        user_service._get_project_name = AsyncMock(return_value="Test Project")
-
         project_accesses = [ProjectAccessBase(
-            serviceCenterId=str(sample_service_center.id),
-            projectId=str(sample_project.id),
+            serviceCenterId=sample_service_center_id,
+            projectId=sample_project_id,
             accessLevel=AccessLevelEnum.TEAM_MEMBER,
             occupancyRate=50.0
         )]
 
         # Act
-        await user_service._manage_project_accesses_with_id_logic(sample_user, project_accesses)
+        await configured_service._manage_project_accesses_with_id_logic(sample_user, project_accesses)
 
         # Assert
-        user_service.engine.save.assert_called()  # Pour créer le nouvel accès
+        configured_service.engine.save.assert_called()  # Pour créer le nouvel accès
 
     @pytest.mark.asyncio
-    async def test_manage_project_accesses_with_invalid_id(self, user_service, sample_user, valid_object_id):
+    @pytest.mark.parametrize("configured_service", [{}], indirect=True)
+    async def test_manage_project_accesses_with_invalid_id(self, configured_service, valid_object_id):
         """Test gestion des accès projet avec ID invalide."""
         # Arrange
-        user_service.engine.find_one.return_value = None
-
         project_accesses = [ProjectAccessBase(
             id="invalid_id",
             serviceCenterId=str(valid_object_id),
@@ -627,8 +612,8 @@ class TestUserServiceAccessIdLogic:
         )]
 
         # Act & Assert
-        with pytest.raises(HTTPException) as exc_info:
-            await user_service._manage_project_accesses_with_id_logic(sample_user, project_accesses)
-
-        assert exc_info.value.status_code == 400
-        assert "Invalid project access ID" in exc_info.value.detail
\ No newline at end of file
+        await assert_http_error(
+            lambda: configured_service._manage_project_accesses_with_id_logic(_DUMMY_USER, project_accesses),
+            400,
+            "Invalid project access ID"
+        )
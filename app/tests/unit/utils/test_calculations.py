@@ -8,7 +8,7 @@ from bson import ObjectId
 
 from app.models.project import Project, ProjectStatus
 from app.models.sprint import SprintStatus, SprintTransversalActivity, Sprint
-from app.models.task import Task, TaskStatus, TASKRFT
+from app.models.task import Task, TaskStatus, TASKRFT, TaskDeliveryStatus
 import app.utils.calculations as calc
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
@@ -117,7 +117,34 @@ async def test_calculate_sprint_metrics_no_tasks(mock_engine):
 
 
 @pytest.mark.asyncio
-async def test_calculate_task_metrics(mock_engine):
+async def test_calculate_sprint_metrics_from_totals():
+    "Test sprint metrics computed from MongoDB totals match the per-task calculation"
+    sprint = Sprint(**{**sample_sprint_data, "status": SprintStatus.DONE}, id=ObjectId())
+    tasks = [Task(**sample_task_data, id=ObjectId()) for _ in range(2)]
+    tasks[0].status = TaskStatus.DONE
+    tasks[0].deliveryStatus = TaskDeliveryStatus.OK
+    tasks[0].timeSpent = 5.0
+    trans_act = SprintTransversalActivity(**sample_sprint_trans_act_data, id=ObjectId(), time_spent=2.0)
+    totals = {
+        "nb_tasks": 2,
+        "total_time_spent": 5.0,
+        "total_story_points": 20.0,
+        "progress_sp": 10.0,
+        "weighted_progress": 1000.0,
+        "velocity": 10.0,
+        "delivered_story_points": 20.0,
+        "nb_task_delivered": 1,
+        "nb_rft_ok": 1
+    }
+
+    metrics = calc.calculate_sprint_metrics_from_totals(sprint, [trans_act], totals)
+
+    assert metrics == await calc.calculate_sprint_metrics(sprint, [trans_act], tasks)
+    assert calc.calculate_sprint_metrics_from_totals(sprint, [], None) == \
+        await calc.calculate_sprint_metrics(sprint, [], [])
+
+
+def test_calculate_task_metrics(mock_engine):
     "Test successful calculation of task metrics"
     dummy_project = Project(**sample_project_data)
     dummy_project.transversal_vs_technical_workload_ratio = 2.0
@@ -132,7 +159,7 @@ async def test_calculate_task_metrics(mock_engine):
 
     mock_engine.find_one.side_effect = [mock_task, dummy_project]
 
-    metrics = await calc.calculate_task_metrics(mock_task, dummy_project.transversal_vs_technical_workload_ratio)
+    metrics = calc.calculate_task_metrics(mock_task, dummy_project.transversal_vs_technical_workload_ratio)
 
     assert isinstance(metrics, dict)
     assert metrics["technical_load"] == expected_technical_load
@@ -140,8 +167,7 @@ async def test_calculate_task_metrics(mock_engine):
     assert metrics["progress"] == expected_progress
 
 
-@pytest.mark.asyncio
-async def test_calculate_task_metrics_no_time(mock_engine):
+def test_calculate_task_metrics_no_time(mock_engine):
     "Test successful calculation of task metrics if no times are set"
     dummy_project = Project(**sample_project_data)
     dummy_project.transversal_vs_technical_workload_ratio = 2.0
@@ -151,7 +177,7 @@ async def test_calculate_task_metrics_no_time(mock_engine):
 
     mock_engine.find_one.side_effect = [mock_task, dummy_project]
 
-    metrics = await calc.calculate_task_metrics(mock_task, dummy_project.transversal_vs_technical_workload_ratio)
+    metrics = calc.calculate_task_metrics(mock_task, dummy_project.transversal_vs_technical_workload_ratio)
 
     assert isinstance(metrics, dict)
     assert metrics["technical_load"] == mock_task.storyPoints / dummy_project.transversal_vs_technical_workload_ratio
@@ -159,8 +185,7 @@ async def test_calculate_task_metrics_no_time(mock_engine):
     assert metrics["progress"] == 0.0
 
 
-@pytest.mark.asyncio
-async def test_calculate_story_points():
+def test_calculate_story_points():
     "Test successful addition of story points"
     task1 = Task(
         sprintId=ObjectId("67043935189669a4d9d1c0bc"),
@@ -184,12 +209,11 @@ async def test_calculate_story_points():
         rft=TASKRFT.OK,
     )
 
-    assert await calc.calculate_story_points([task1, task2]) == 3
-    assert await calc.calculate_story_points([]) == 0
+    assert calc.calculate_story_points([task1, task2]) == 3
+    assert calc.calculate_story_points([]) == 0
 
 
-@pytest.mark.asyncio
-async def test_calculate_sprint_progress():
+def test_calculate_sprint_progress():
     "Test successful calculations of progress"
     task_inprogress = Task(
         sprintId=ObjectId("67043935189669a4d9d1c0bc"),
@@ -227,13 +251,12 @@ async def test_calculate_sprint_progress():
         rft=TASKRFT.OK,
     )
 
-    assert await calc.calculate_progress([task_inprogress, task_done]) == 200/3
-    assert await calc.calculate_progress([task_inprogress, task_done, task_cancelled]) == 200/3
-    assert await calc.calculate_progress(None) == 100
+    assert calc.calculate_progress([task_inprogress, task_done]) == 200/3
+    assert calc.calculate_progress([task_inprogress, task_done, task_cancelled]) == 200/3
+    assert calc.calculate_progress(None) == 100
 
 
-@pytest.mark.asyncio
-async def test_calculate_velocity():
+def test_calculate_velocity():
     task1 = Task(           # deliverySprint is current sprint but not Done
         sprintId=ObjectId("67043935189669a4d9d1c0bc"),
         projectId=ObjectId("67043935189669a4d9d1c0bd"),
@@ -264,12 +287,11 @@ async def test_calculate_velocity():
         rft=TASKRFT.OK,
     )
 
-    assert await calc.calculate_velocity([task1,task2,task3], "sprint") == 3
-    assert await calc.calculate_velocity([], "sprint") == 0
+    assert calc.calculate_velocity([task1,task2,task3], "sprint") == 3
+    assert calc.calculate_velocity([], "sprint") == 0
 
 
-@pytest.mark.asyncio
-async def test_calculate_total_time():
+def test_calculate_total_time():
     "Test successful calculation of total time on a given sprint"
     task1 = Task(
         sprintId=ObjectId("67043935189669a4d9d1c0bc"),
@@ -291,11 +313,10 @@ async def test_calculate_total_time():
         rft=TASKRFT.OK,
     )
 
-    assert await calc.calculate_total_time(None) == 0.0
-    assert await calc.calculate_total_time([task1,task2]) == 4.77
+    assert calc.calculate_total_time(None) == 0.0
+    assert calc.calculate_total_time([task1,task2]) == 4.77
 
-@pytest.mark.asyncio
-async def test_calculate_transversal_time():
+def test_calculate_transversal_time():
     "Test successful calculation of transversal time on a given sprint"
     sprint1 = SprintTransversalActivity(
         sprintId=ObjectId(),
@@ -309,26 +330,24 @@ async def test_calculate_transversal_time():
         time_spent=5.0,
     )
 
-    assert await calc.calculate_transversal_time(None) == 0
-    assert await calc.calculate_transversal_time([sprint1,sprint2]) == 8.0
+    assert calc.calculate_transversal_time(None) == 0
+    assert calc.calculate_transversal_time([sprint1,sprint2]) == 8.0
 
 
-@pytest.mark.asyncio
-async def test_calculate_otd():
+def test_calculate_otd():
     "Test successful calculation of sprint OTD in percentage"
     velocity = 2.5
     in_scope = 10
 
-    assert await calc.calculate_otd(SprintStatus.DONE, velocity, in_scope) == 25            # assert successful calculation
-    assert await calc.calculate_otd(SprintStatus.INPROGRESS, velocity, in_scope) == 0.0     # assert no calculation if sprint status not done
+    assert calc.calculate_otd(SprintStatus.DONE, velocity, in_scope) == 25            # assert successful calculation
+    assert calc.calculate_otd(SprintStatus.INPROGRESS, velocity, in_scope) == 0.0     # assert no calculation if sprint status not done
 
     in_scope = 0.0
 
-    assert await calc.calculate_otd(SprintStatus.DONE, velocity, in_scope) == 0.0           # assert no calculation if no SP in sprint
+    assert calc.calculate_otd(SprintStatus.DONE, velocity, in_scope) == 0.0           # assert no calculation if no SP in sprint
 
 
-@pytest.mark.asyncio
-async def test_calculate_oqd():
+def test_calculate_oqd():
     current_sprint_name = "current"
 
     task1 = Task(       # Should not count because task is not done.
@@ -383,10 +402,10 @@ async def test_calculate_oqd():
 
     tasks = [task1,task2,task3,task4,task5]
 
-    assert await calc.calculate_oqd(current_sprint_name, SprintStatus.DONE, tasks) == 100/3           # assert successful calculation
-    assert await calc.calculate_oqd(current_sprint_name, SprintStatus.DONE, []) == 0            # assert no calculation if no tasks
-    assert await calc.calculate_oqd(current_sprint_name, SprintStatus.TODO, tasks) == 0               # assert no calculation if sprint not Done
-    assert await calc.calculate_oqd(current_sprint_name, SprintStatus.DONE, [task1]) == 0       # assert no calculation if no tasks Done
+    assert calc.calculate_oqd(current_sprint_name, SprintStatus.DONE, tasks) == 100/3           # assert successful calculation
+    assert calc.calculate_oqd(current_sprint_name, SprintStatus.DONE, []) == 0            # assert no calculation if no tasks
+    assert calc.calculate_oqd(current_sprint_name, SprintStatus.TODO, tasks) == 0               # assert no calculation if sprint not Done
+    assert calc.calculate_oqd(current_sprint_name, SprintStatus.DONE, [task1]) == 0       # assert no calculation if no tasks Done
 
 
 def test_date_conversion():
@@ -4,6 +4,9 @@ from bson import ObjectId
 
 from app.utils.common import convert_objectid_to_str, validate_objectid, create_pagination_metadata, serialize_datetime
 
+_DT = datetime(2025, 8, 12)
+_DT_STR = "2025-08-12T00:00:00"
+
 
 def test_convert_objectid_to_str():
     oids = {
@@ -75,6 +78,4 @@ def test_create_pagination_metadata():
 
 def test_serialize_datetime():
     assert serialize_datetime(None) is None
-
-    dt = datetime(year=2025, month=8, day=12)
-    assert serialize_datetime(dt) == "2025-08-12T00:00:00"
+    assert serialize_datetime(_DT) == _DT_STR
@@ -1,15 +1,22 @@
+import mmap
 from datetime import datetime, timedelta
+from tempfile import SpooledTemporaryFile
 from unittest.mock import AsyncMock, MagicMock
 from zoneinfo import ZoneInfo
 
+import pandas as pd
 import pytest
 from bson import ObjectId
 from fastapi import UploadFile, HTTPException
+from pymongo.errors import BulkWriteError
 
 from app.api.v1.endpoints.tasks import import_csv
+from app.utils import csv_import
+from app.utils.csv_import import read_upload, read_header_line, analyse_csv, map_csv_to_tasks, \
+    process_tasks_and_duplicates, process_tasks_chunk
 from app.models.project import Project
 from app.models.sprint import Sprint, SprintStatus
-from app.models.task import SourceType, ImportCSVResponse, Task, TaskType, TaskStatus
+from app.models.task import SourceType, ImportCSVResponse, Task, TaskType, TaskStatus, DB_FIELD_MAPPING
 from app.services.sprint_service import SprintService
 from app.services.task_service import TaskService
 
@@ -37,10 +44,19 @@ def valid_object_id():
 def mock_csv_file():
     file = MagicMock(spec=UploadFile)
     file.filename = "test.csv"
+    file.file = MagicMock(_rolled=False)
     file.read = AsyncMock(return_value=b'Issue key,Issue Type,Summary,Custom field (Story Points)\nTASK-1,Task,Test Task,3.0\n')
     return file
 
 
+@pytest.fixture
+def mock_collection():
+    """Create a mock task collection without any task in the sprint."""
+    collection = MagicMock(insert_many=AsyncMock())
+    collection.find.return_value.__aiter__.return_value = []
+    return collection
+
+
 @pytest.fixture
 def mock_sprint(valid_object_id):
     """Create a mock Sprint with all required fields."""
@@ -64,9 +80,8 @@ async def test_import_csv_success(mock_engine, mock_async_engine, valid_object_i
     mock_async_engine.find_one = AsyncMock(side_effect=[mock_sprint, MagicMock(Project)])
 
     mock_async_engine.find = AsyncMock(return_value=[])
-    mock_async_engine.save_all = AsyncMock()
+    mock_async_engine.get_collection = MagicMock(return_value=MagicMock(insert_many=AsyncMock()))
     mock_async_engine.save = AsyncMock()
-    mock_async_engine.count = AsyncMock(return_value=1)
 
     mock_engine.find_one_return_value = mock_sprint
     sprint_service = SprintService(mock_engine)
@@ -76,7 +91,6 @@ async def test_import_csv_success(mock_engine, mock_async_engine, valid_object_i
         projectId=str(valid_object_id),
         sprintId=str(valid_object_id),
         file=mock_csv_file,
-        source=SourceType.JIRA,
         sprint_service=sprint_service,
         task_service=task_service
     )
@@ -99,7 +113,6 @@ async def test_import_csv_invalid_file_extension(mock_engine, mock_async_engine,
             projectId=str(valid_object_id),
             sprintId=str(valid_object_id),
             file=file,
-            source=SourceType.JIRA,
             sprint_service=sprint_service,
             task_service=task_service
         )
@@ -121,7 +134,6 @@ async def test_import_csv_invalid_sprint(mock_engine, mock_async_engine, valid_o
             projectId=str(valid_object_id),
             sprintId=str(valid_object_id),
             file=mock_csv_file,
-            source=SourceType.JIRA,
             sprint_service=sprint_service,
             task_service=task_service
         )
@@ -136,6 +148,7 @@ async def test_import_csv_with_duplicates(mock_engine, mock_async_engine, valid_
     """Test CSV import with duplicate tasks."""
     file = MagicMock(spec=UploadFile)
     file.filename = "test.csv"
+    file.file = MagicMock(_rolled=False)
     file.read = AsyncMock(
         return_value=b'Issue key,Issue Type,Summary,Custom field (Story Points)\nTASK-1,Task,Test Task,3.0\nTASK-1,Task,Duplicate Task,5.0\n')
 
@@ -149,8 +162,9 @@ async def test_import_csv_with_duplicates(mock_engine, mock_async_engine, valid_
         sprintId=valid_object_id,
         projectId=valid_object_id
     )
-    mock_async_engine.find = AsyncMock(return_value=[existing_task])
-    mock_async_engine.count = AsyncMock(return_value=1)
+    collection = MagicMock()
+    collection.find.return_value.__aiter__.return_value = [{"_id": existing_task.id, "key": existing_task.key}]
+    mock_async_engine.get_collection = MagicMock(return_value=collection)
     task_service = TaskService(mock_async_engine)
     mock_engine.find_one.return_value = mock_sprint
     sprint_service = SprintService(mock_engine)
@@ -159,7 +173,6 @@ async def test_import_csv_with_duplicates(mock_engine, mock_async_engine, valid_
         projectId=str(valid_object_id),
         sprintId=str(valid_object_id),
         file=file,
-        source=SourceType.JIRA,
         task_service=task_service,
         sprint_service=sprint_service
     )
@@ -172,12 +185,13 @@ async def test_import_csv_with_invalid_rows(mock_engine, mock_async_engine, vali
     """Test CSV import with invalid row data."""
     file = MagicMock(spec=UploadFile)
     file.filename = "test.csv"
+    file.file = MagicMock(_rolled=False)
     file.read = AsyncMock(
         return_value=b'Issue key,Issue Type,Summary,Custom field (Story Points)\nTASK-1,Task\nTASK-2,Task,Valid Task\n')
 
     mock_async_engine.find_one = AsyncMock(side_effect=[mock_sprint, MagicMock(Project)])
     mock_async_engine.find = AsyncMock(return_value=[])
-    mock_async_engine.count = AsyncMock(return_value=1)
+    mock_async_engine.get_collection = MagicMock(return_value=MagicMock(insert_many=AsyncMock()))
     task_service = TaskService(mock_async_engine)
     sprint_service = SprintService(mock_engine)
 
@@ -185,8 +199,229 @@ async def test_import_csv_with_invalid_rows(mock_engine, mock_async_engine, vali
         projectId=str(valid_object_id),
         sprintId=str(valid_object_id),
         file=file,
-        source=SourceType.JIRA,
         sprint_service=sprint_service,
         task_service=task_service
     )
-    assert response.msg == "Successfully imported 1 tasks"
+    assert response.msg == "Successfully imported 1 tasks. Skipped row index number: 2 with missing key or summary"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_size, expected_type", [(1024, bytes), (8, mmap.mmap)], ids=["in_memory", "rolled"])
+async def test_read_upload(max_size, expected_type):
+    """Test reading an upload kept in memory or spooled to disk."""
+    content = b'Issue key,Issue Type,Summary,Custom field (Story Points)\nTASK-1,Task,Test Task,3.0\n'
+    spool = SpooledTemporaryFile(max_size=max_size)
+    spool.write(content)
+    spool.seek(0)
+
+    result = await read_upload(UploadFile(file=spool, filename="test.csv"))
+
+    assert isinstance(result, expected_type)
+    assert result[:] == content
+
+
+@pytest.mark.parametrize("content, expected", [
+    (b'Issue key,Issue Type,Summary\nTASK-1,Task,Test\n', "Issue key,Issue Type,Summary"),
+    (b'\xef\xbb\xbf"Issue key";"Summary"\r\nTASK-1;Test\r\n', "Issue key;Summary"),
+    (b'Issue key,Summary', "Issue key,Summary"),
+], ids=["plain", "bom_quoted_crlf", "no_newline"])
+def test_read_header_line(content, expected):
+    """Test the header line is decoded without BOM, quotes and line ending."""
+    assert read_header_line(content) == expected
+
+
+def test_read_header_line_empty():
+    """Test a blank CSV content is rejected."""
+    with pytest.raises(HTTPException) as exc_info:
+        read_header_line(b' \n\t\n')
+
+    assert exc_info.value.status_code == 400
+    assert "Empty CSV content" in exc_info.value.detail
+
+
+@pytest.mark.parametrize("content, source_type, summary", [
+    (b'Issue key,Issue Type,Summary,Custom field (Story Points)\nTASK-1,Task,Test Task,3.0\n',
+     SourceType.JIRA, "Test Task"),
+    (b'\xef\xbb\xbfIssue key;Issue Type;Summary;Custom field (Story Points)\nTASK-1;Task;Test Task;3,0\n',
+     SourceType.JIRA, "Test Task"),
+    (b'Issue key,Issue Type,Summary,Custom field (Story Points)\nTASK-1,Task,"Test, quoted",3.0\n',
+     SourceType.JIRA, "Test, quoted"),
+    (b'Issue ID\tTitle\tAssignee\n42\tTest Task\tJohn\n', SourceType.GITLAB, "Test Task"),
+], ids=["comma", "bom_semicolon", "quoted_separator", "gitlab_tab"])
+def test_analyse_csv(content, source_type, summary):
+    """Test the source type and separator detection on the parsed chunks."""
+    chunks, detected_type = analyse_csv(content)
+    df = pd.concat(list(chunks))
+
+    assert detected_type == source_type
+    assert list(df.columns) == list(DB_FIELD_MAPPING[source_type])
+    assert df.rename(columns=DB_FIELD_MAPPING[source_type]).iloc[0]['summary'] == summary
+
+
+def test_analyse_csv_chunks(monkeypatch):
+    """Test a CSV longer than the chunk size is parsed in several chunks."""
+    monkeypatch.setattr(csv_import, "CSV_CHUNK_SIZE", 2)
+    content = b'Issue key,Issue Type,Summary,Custom field (Story Points)\n' + b''.join(
+        b'TASK-%d,Task,Test Task,1\n' % i for i in range(5))
+
+    chunks, _ = analyse_csv(content)
+
+    assert [df['Issue key'].tolist() for df in chunks] == [['TASK-0', 'TASK-1'], ['TASK-2', 'TASK-3'], ['TASK-4']]
+
+
+@pytest.mark.parametrize("column, field, values, expected", [
+    ("Issue Type", "type", ["Bug", "STORY", "unknown", None], [TaskType.BUG, TaskType.STORY, TaskType.TASK, TaskType.TASK]),
+    ("Status", "status", ["Done", "in progress", "unknown", None],
+     [TaskStatus.DONE, TaskStatus.INPROGRESS, TaskStatus.TODO, TaskStatus.TODO]),
+], ids=["type", "status"])
+def test_map_csv_to_tasks_enums(column, field, values, expected):
+    """Test type and status labels are mapped to their enum, unknown or missing ones to the default."""
+    df = pd.DataFrame({"Issue key": ["TASK-1", "TASK-2", "TASK-3", "TASK-4"], "Summary": ["Test"] * 4, column: values})
+
+    mapped_df, invalid_df = map_csv_to_tasks(df, {**DB_FIELD_MAPPING[SourceType.JIRA], "Status": "status"})
+
+    assert mapped_df[field].tolist() == expected
+    assert all(type(value) is type(expected[0]) for value in mapped_df[field])
+    assert invalid_df.empty
+
+
+def test_map_csv_to_tasks_missing_values():
+    """Test rows without key or summary are split from the valid rows and story points default to 0."""
+    df = pd.DataFrame({
+        "Issue key": ["TASK-1", None, "TASK-3", "TASK-4"],
+        "Issue Type": ["Task"] * 4,
+        "Summary": ["Test", "Test", None, "Test"],
+        "Custom field (Story Points)": ["3", "2", "1", "n/a"],
+    })
+
+    mapped_df, invalid_df = map_csv_to_tasks(df, DB_FIELD_MAPPING[SourceType.JIRA])
+
+    assert mapped_df['key'].tolist() == ["TASK-1", "TASK-4"]
+    assert mapped_df['storyPoints'].tolist() == [3.0, 0.0]
+    assert list(mapped_df.columns) == ["key", "type", "summary", "storyPoints", "status"]
+    assert invalid_df.index.tolist() == [1, 2]
+    assert list(invalid_df.columns) == list(df.columns)
+
+
+@pytest.mark.asyncio
+async def test_process_tasks_and_duplicates_chunks(mock_collection, mock_sprint, valid_object_id):
+    """Test only the keys already in the sprint are duplicates, whichever chunk they are in."""
+    mock_collection.find.return_value.__aiter__.return_value = [{"key": "TASK-0"}]
+    engine = MagicMock(save=AsyncMock(), get_collection=MagicMock(return_value=mock_collection))
+    mapping = DB_FIELD_MAPPING[SourceType.JIRA]
+    chunks = [
+        pd.DataFrame({"Issue key": ["TASK-0", "TASK-1", "TASK-2", "TASK-2"], "Issue Type": ["Task"] * 4,
+                      "Summary": ["Test"] * 4, "Custom field (Story Points)": [1.0] * 4}),
+        pd.DataFrame({"Issue key": ["TASK-1", "TASK-3", None], "Issue Type": ["Bug"] * 3,
+                      "Summary": ["Test"] * 3, "Custom field (Story Points)": [2.0] * 3}, index=[4, 5, 6]),
+    ]
+
+    task_ids, duplicate_keys, invalid_rows = await process_tasks_and_duplicates(
+        (map_csv_to_tasks(df, mapping) for df in chunks), mock_sprint, valid_object_id, engine)
+
+    inserted = [doc for call in mock_collection.insert_many.await_args_list for doc in call.args[0]]
+    assert [doc["key"] for doc in inserted] == ["TASK-1", "TASK-2", "TASK-2", "TASK-1", "TASK-3"]
+    assert duplicate_keys == ["TASK-0"]
+    assert task_ids == [doc["_id"] for doc in inserted]
+    assert mock_sprint.task == task_ids
+    assert invalid_rows.index.tolist() == [6]
+    # The second chunk only looks up the keys not imported by the first one
+    assert [call.args[0]["key"]["$in"] for call in mock_collection.find.call_args_list] == \
+        [["TASK-0", "TASK-1", "TASK-2"], ["TASK-3"]]
+    assert mock_collection.find.call_args.args[1] == {"key": 1, "_id": 0}
+    engine.save.assert_awaited_once_with(mock_sprint)
+
+
+@pytest.mark.asyncio
+async def test_process_tasks_and_duplicates_partial_import(mock_collection, mock_sprint, valid_object_id):
+    """Test an error in a later chunk keeps the imported tasks in the sprint and reports a partial import."""
+    engine = MagicMock(save=AsyncMock(), get_collection=MagicMock(return_value=mock_collection))
+
+    def chunks():
+        yield map_csv_to_tasks(pd.DataFrame({"Issue key": ["TASK-1"], "Issue Type": ["Task"], "Summary": ["Test"],
+                                             "Custom field (Story Points)": [1.0]}), DB_FIELD_MAPPING[SourceType.JIRA])
+        raise HTTPException(status_code=400, detail="Error parsing CSV: bad line")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await process_tasks_and_duplicates(chunks(), mock_sprint, valid_object_id, engine)
+
+    assert exc_info.value.status_code == 400
+    assert exc_info.value.detail == \
+        "Error parsing CSV: bad line. Partial import: 1 tasks were imported before the error"
+    assert len(mock_sprint.task) == 1
+    engine.save.assert_awaited_once_with(mock_sprint)
+
+
+@pytest.mark.asyncio
+async def test_process_tasks_chunk_documents(mock_collection, mock_sprint, valid_object_id):
+    """Test the inserted documents match the Task model documents."""
+    mock_collection.find.return_value.__aiter__.return_value = [{"key": "TASK-2"}]
+    engine = MagicMock(get_collection=MagicMock(return_value=mock_collection))
+    mapped_df, _ = map_csv_to_tasks(pd.DataFrame({"Issue key": ["TASK-1", "TASK-2"], "Issue Type": ["Bug", "Story"],
+                                                  "Summary": ["Test", "Other"],
+                                                  "Custom field (Story Points)": [3, None]}),
+                                    DB_FIELD_MAPPING[SourceType.JIRA])
+    imported_keys = set()
+
+    task_ids, duplicate_keys = await process_tasks_chunk(mapped_df, mock_sprint, valid_object_id,
+                                                         imported_keys, engine)
+
+    docs = mock_collection.insert_many.await_args.args[0]
+    expected = Task(key="TASK-1", summary="Test", type=TaskType.BUG, storyPoints=3.0,
+                    sprintId=valid_object_id, projectId=valid_object_id).model_dump_doc()
+    assert len(docs) == 1
+    assert set(docs[0]) == set(expected)
+    assert {k: v for k, v in docs[0].items() if k not in ("_id", "created_at")} == \
+        {k: v for k, v in expected.items() if k not in ("_id", "created_at")}
+    assert type(docs[0]["type"]) is TaskType and type(docs[0]["storyPoints"]) is float
+    assert task_ids == [docs[0]["_id"]]
+    assert mock_sprint.task == task_ids
+    assert duplicate_keys == ["TASK-2"]
+    assert imported_keys == {"TASK-1"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("column, values, expected", [
+    ("progress", ["0.5"], {"progress": 0.5}),
+    ("Summary", [42], None),
+    ("progress", ["abc"], None),
+], ids=["other_task_field", "non_text_summary", "invalid_other_task_field"])
+async def test_process_tasks_chunk_validation(mock_collection, mock_sprint, valid_object_id, column, values,
+                                              expected):
+    """Test chunks with non coerced values are validated by the Task model."""
+    engine = MagicMock(get_collection=MagicMock(return_value=mock_collection))
+    df = pd.DataFrame({"Issue key": ["TASK-1"], "Issue Type": ["Task"], "Summary": ["Test"],
+                       "Custom field (Story Points)": [1.0]})
+    df[column] = values
+    mapped_df, _ = map_csv_to_tasks(df, DB_FIELD_MAPPING[SourceType.JIRA])
+
+    if expected is None:
+        with pytest.raises(HTTPException) as exc_info:
+            await process_tasks_chunk(mapped_df, mock_sprint, valid_object_id, set(), engine)
+
+        assert exc_info.value.status_code == 400
+        assert "Error creating tasks from CSV" in exc_info.value.detail
+        mock_collection.insert_many.assert_not_awaited()
+    else:
+        await process_tasks_chunk(mapped_df, mock_sprint, valid_object_id, set(), engine)
+
+        doc = mock_collection.insert_many.await_args.args[0][0]
+        assert {k: doc[k] for k in expected} == expected
+        assert doc["sprintId"] == valid_object_id
+
+
+@pytest.mark.asyncio
+async def test_process_tasks_chunk_bulk_write_error(mock_collection, mock_sprint, valid_object_id):
+    """Test the documents written before an insert failure are still added to the sprint."""
+    mock_collection.insert_many.side_effect = BulkWriteError({"writeErrors": [{"index": 1, "code": 11000}]})
+    engine = MagicMock(get_collection=MagicMock(return_value=mock_collection))
+    mapped_df, _ = map_csv_to_tasks(pd.DataFrame({"Issue key": ["TASK-1", "TASK-2", "TASK-3"],
+                                                  "Issue Type": ["Task"] * 3, "Summary": ["Test"] * 3,
+                                                  "Custom field (Story Points)": [1.0] * 3}),
+                                    DB_FIELD_MAPPING[SourceType.JIRA])
+
+    with pytest.raises(BulkWriteError):
+        await process_tasks_chunk(mapped_df, mock_sprint, valid_object_id, set(), engine)
+
+    docs = mock_collection.insert_many.await_args.args[0]
+    assert mock_sprint.task == [docs[0]["_id"], docs[2]["_id"]]
@@ -1,14 +1,37 @@
 """
 Correction des fonctions de calcul avec deliveryStatus modifié - Focus sur OTD.
 """
-import asyncio
-from datetime import datetime, timedelta, timezone
-from typing import Dict, List
-from math import floor
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional
 
 from app.models.sprint import Sprint, SprintStatus, SprintTransversalActivity
 from app.models.task import TaskStatus, TASKRFT, Task, TaskDeliveryStatus
 
+_ZERO = timedelta(0)
+
+# _WD_REMAINDER[jour de départ][r] = jours ouvrables parmi r jours consécutifs (Lundi=0, Vendredi=4)
+_WD_REMAINDER = [
+    [sum(1 for day in range(start, start + r) if day % 7 < 5) for r in range(7)]
+    for start in range(7)
+]
+
+# Métriques d'un sprint sans tâche, "duration" est renseignée à chaque appel
+_EMPTY_METRICS_TEMPLATE = {
+    "duration": 0,
+    "scoped": 0.0,
+    "velocity": 0.0,
+    "progress": 0.0,  # Moyenne des progrès des tâches
+    "time_spent": 0.0,
+    "otd": 0.0,
+    "oqd": 0.0,
+    # Nouvelles métriques selon D-Req2
+    "progress_sp": 0.0,  # Progression en Story Points
+    "predictability": 0.0,  # Predictability %
+    "rft": 0.0,  # RFT %
+    "transversal_time": 0.0
+}
+
 
 async def calculate_sprint_metrics(sprint: Sprint, trans_acts: List[SprintTransversalActivity],
                                    tasks: List[Task]) -> Dict[str, float]:
@@ -16,60 +39,129 @@ async def calculate_sprint_metrics(sprint: Sprint, trans_acts: List[SprintTransv
     Calcule les métriques du sprint selon les spécifications D-Req2.
     Maintient la compatibilité avec les noms de clés existants.
     """
+    return _compute_sprint_metrics(sprint, trans_acts, tasks)
+
+
+def calculate_sprint_metrics_from_totals(sprint: Sprint, trans_acts: List[SprintTransversalActivity],
+                                         totals: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """
+    Calcule les métriques du sprint à partir des sommes agrégées par MongoDB
+    (TaskService.aggregate_sprint_metrics), sans charger les tâches.
+    """
+    duration = calculate_weekdays(sprint.startDate, sprint.dueDate)
+
+    if not totals or not totals["nb_tasks"]:
+        metrics = _EMPTY_METRICS_TEMPLATE.copy()
+        metrics["duration"] = duration
+        return metrics
+
+    # Les tâches livrées (et donc le RFT) ne comptent que pour un sprint Done
+    sprint_done = sprint.status == SprintStatus.DONE
+    return _build_sprint_metrics(
+        duration, sprint_done, calculate_transversal_time_in_days(trans_acts),
+        totals["total_story_points"], totals["progress_sp"], totals["weighted_progress"], totals["velocity"],
+        totals["total_time_spent"], totals["delivered_story_points"],
+        totals["nb_task_delivered"] if sprint_done else 0.0,
+        totals["nb_rft_ok"] if sprint_done else 0.0
+    )
+
+
+def _compute_sprint_metrics(sprint: Sprint, trans_acts: List[SprintTransversalActivity],
+                            tasks: List[Task]) -> Dict[str, float]:
+    """
+    Réduction en une seule passe sur les tâches.
+    """
     duration = calculate_weekdays(sprint.startDate, sprint.dueDate)
 
     if not tasks:
-        return {
-            "duration": duration,
-            "scoped": 0.0,
-            "velocity": 0.0,
-            "progress": 0.0,  # Moyenne des progrès des tâches
-            "time_spent": 0.0,
-            "otd": 0.0,
-            "oqd": 0.0,
-            # Nouvelles métriques selon D-Req2
-            "progress_sp": 0.0,  # Progression en Story Points
-            "predictability": 0.0,  # Predictability %
-            "rft": 0.0,  # RFT %
-            "transversal_time": 0.0
-        }
-
-    # Calculs parallèles
-    total_transversal_time, total_story_points, progress_sp, velocity, total_time_spent, rft, avg_progress, otd = await asyncio.gather(
-        calculate_transversal_time_in_days(trans_acts),
-        calculate_story_points(tasks),
-        calculate_progress_in_story_points(tasks),
-        calculate_velocity(tasks),
-        calculate_total_time_in_days(tasks),
-        calculate_rft_percentage(sprint.status, tasks),
-        calculate_average_progress(tasks),
-        calculate_otd_percentage(sprint.status, tasks)  # Nouveau calcul OTD
+        metrics = _EMPTY_METRICS_TEMPLATE.copy()
+        metrics["duration"] = duration
+        return metrics
+
+    total_transversal_time = calculate_transversal_time_in_days(trans_acts)
+
+    # Une seule passe sur les tâches pour toutes les réductions
+    sprint_done = sprint.status == SprintStatus.DONE
+    total_story_points = 0.0
+    progress_sp = 0.0
+    weighted_progress = 0.0
+    velocity = 0.0
+    total_time_spent = 0.0
+    delivered_story_points = 0.0
+    nb_task_delivered = 0.0
+    nb_rft_ok = 0.0
+
+    for task in tasks:
+        time_spent = task.timeSpent
+        total_time_spent += time_spent if time_spent else 0
+
+        status = task.status
+        if status == TaskStatus.CANCELLED:
+            continue
+
+        story_points = task.storyPoints
+        delivery_status = task.deliveryStatus
+        delivery_ok = delivery_status == TaskDeliveryStatus.OK
+        task_progress = task.progress
+        if task_progress is None:
+            task_progress = 0
+
+        total_story_points += story_points
+        progress_sp += story_points * (task_progress / 100)
+        weighted_progress += story_points * task_progress
+        if delivery_ok or delivery_status == TaskDeliveryStatus.DEFAULT:
+            delivered_story_points += story_points
+
+        if status == TaskStatus.DONE:
+            velocity += story_points
+            if sprint_done and delivery_ok:
+                nb_task_delivered += 1
+                if task.rft == TASKRFT.OK:
+                    nb_rft_ok += 1
+
+    return _build_sprint_metrics(
+        duration, sprint_done, total_transversal_time, total_story_points, progress_sp, weighted_progress,
+        velocity, total_time_spent, delivered_story_points, nb_task_delivered, nb_rft_ok
     )
 
+
+def _build_sprint_metrics(duration: int, sprint_done: bool, total_transversal_time: float,
+                          total_story_points: float, progress_sp: float, weighted_progress: float,
+                          velocity: float, total_time_spent: float, delivered_story_points: float,
+                          nb_task_delivered: float, nb_rft_ok: float) -> Dict[str, float]:
+    """
+    Construit le dictionnaire de métriques du sprint à partir des sommes calculées sur les tâches.
+    """
+    avg_progress = weighted_progress / total_story_points if total_story_points != 0 else 100.0
+    otd = (delivered_story_points / total_story_points) * 100 if total_story_points != 0 else 0.0
+    rft = (nb_rft_ok / nb_task_delivered) * 100 if nb_task_delivered != 0 else 0.0
+
     # Predictability (basé sur la vélocité) - seulement si sprint Done
     predictability = 0.0
-    if sprint.status == SprintStatus.DONE and total_story_points > 0:
+    if sprint_done and total_story_points > 0:
         predictability = (velocity / total_story_points) * 100
 
+    rft = round(rft, 0)  # Exposé sous "oqd" et "rft"
+
     return {
         # Clés existantes pour compatibilité
-        "duration": round(duration, 1),
+        "duration": duration,  # Nombre entier de jours ouvrables
         "scoped": round(total_story_points, 1),
         "velocity": round(velocity, 1),
         "progress": round(avg_progress, 0),  # Progression moyenne des tâches
         "time_spent": round(total_time_spent + total_transversal_time, 1),
         "otd": round(otd, 0),  # Nouveau calcul OTD corrigé
-        "oqd": round(rft, 0),
+        "oqd": rft,
 
         # Nouvelles métriques selon D-Req2
         "progress_sp": round(progress_sp, 1),  # Progression en Story Points
         "predictability": round(predictability, 0),  # Predictability %
-        "rft": round(rft, 0),  # RFT %
+        "rft": rft,  # RFT %
         "transversal_time": round(total_transversal_time, 1)
     }
 
 
-async def calculate_otd_percentage(status: SprintStatus, tasks: List[Task]) -> float:
+def calculate_otd_percentage(status: SprintStatus, tasks: List[Task]) -> float:
     """
     Calcule l'OTD (%) = pourcentage de story points des tâches dont le delivery status est OK ou DEFAULT (null).
     Seulement calculé quand le Sprint est Done.
@@ -96,7 +188,7 @@ async def calculate_otd_percentage(status: SprintStatus, tasks: List[Task]) -> f
     return (delivered_story_points / total_story_points) * 100
 
 
-async def calculate_average_progress(tasks: List[Task]) -> float:
+def calculate_average_progress(tasks: List[Task]) -> float:
     """
     Calcule la progression moyenne pondérée par les Story Points.
     Maintient la compatibilité avec l'ancien système.
@@ -119,7 +211,7 @@ async def calculate_average_progress(tasks: List[Task]) -> float:
     return sum_progress / sum_story_points
 
 
-async def calculate_progress_in_story_points(tasks: List[Task]) -> float:
+def calculate_progress_in_story_points(tasks: List[Task]) -> float:
     """
     Calcule la progression en Story Points = somme des SPs multipliés par leur progression en %.
     Nouvelle métrique selon D-Req2.
@@ -136,7 +228,7 @@ async def calculate_progress_in_story_points(tasks: List[Task]) -> float:
     return progress_sp
 
 
-async def calculate_total_time_in_days(tasks: List[Task]) -> float:
+def calculate_total_time_in_days(tasks: List[Task]) -> float:
     """
     Calcule le temps total passé en jours.
     """
@@ -149,7 +241,7 @@ async def calculate_total_time_in_days(tasks: List[Task]) -> float:
     return total_time
 
 
-async def calculate_transversal_time_in_days(activities: List[SprintTransversalActivity]) -> float:
+def calculate_transversal_time_in_days(activities: List[SprintTransversalActivity]) -> float:
     """
     Calcule le temps transversal en jours.
     """
@@ -162,7 +254,7 @@ async def calculate_transversal_time_in_days(activities: List[SprintTransversalA
     return total_transversal_time
 
 
-async def calculate_rft_percentage(status: SprintStatus, tasks: List[Task]) -> float:
+def calculate_rft_percentage(status: SprintStatus, tasks: List[Task]) -> float:
     """
     Calcule le RFT (%) = nombre de RFT OK / nombre de Tasks avec Delivery Status = OK.
     Seulement calculé quand le Sprint est Done.
@@ -185,7 +277,7 @@ async def calculate_rft_percentage(status: SprintStatus, tasks: List[Task]) -> f
     return (nb_rft_ok / nb_task_delivered) * 100
 
 
-async def calculate_task_metrics(task: Task, trans_tech_ratio: float) -> Dict[str, float]:
+def calculate_task_metrics(task: Task, trans_tech_ratio: float) -> Dict[str, float]:
     """
     Calcule les métriques de tâche selon les spécifications D-Req2.
     """
@@ -216,7 +308,7 @@ async def calculate_task_metrics(task: Task, trans_tech_ratio: float) -> Dict[st
     }
 
 
-async def calculate_story_points(tasks: List[Task]) -> float:
+def calculate_story_points(tasks: List[Task]) -> float:
     """
     Calcule la somme des story points dans une liste de tâches.
     """
@@ -231,7 +323,7 @@ async def calculate_story_points(tasks: List[Task]) -> float:
     return total_story_points
 
 
-async def calculate_velocity(tasks: List[Task]) -> float:
+def calculate_velocity(tasks: List[Task]) -> float:
     """
     Calcule la vélocité = somme des SPs dont le statut est "Done".
     """
@@ -256,43 +348,54 @@ def calculate_weekdays(start_date: datetime, due_date: datetime) -> int:
     if start > due:
         start, due = due, start
 
-    weekdays = 0
-    current_date = start.date()
+    return _weekdays_cached(start.date(), due.date())
 
-    while current_date <= due.date():  # Inclusif
-        if current_date.weekday() < 5:  # Lundi=0, Vendredi=4
-            weekdays += 1
-        current_date += timedelta(days=1)
 
-    return weekdays
+@lru_cache(maxsize=4096)
+def _weekdays_cached(start_day: date, due_day: date) -> int:
+    """
+    Nombre de jours ouvrables entre deux dates (incluses), mis en cache par couple de dates.
+    """
+    delta_days = (due_day - start_day).days + 1  # Inclusif
+
+    # Chaque semaine complète compte 5 jours ouvrables, le reste vient de la table
+    full_weeks, remainder = divmod(delta_days, 7)
+    return full_weeks * 5 + _WD_REMAINDER[start_day.weekday()][remainder]
 
 
 def make_datetime_offset_naive(dt: datetime) -> datetime:
     """
     Convertit un datetime offset-aware en offset-naive (UTC).
     """
-    if dt.tzinfo is not None and dt.tzinfo.utcoffset(dt) is not None:
-        return dt.astimezone(timezone.utc).replace(tzinfo=None)
-    return dt
+    tz = dt.tzinfo
+    if tz is None:
+        return dt
+    offset = tz.utcoffset(dt)
+    if offset is None:
+        return dt
+    if offset == _ZERO:
+        # Déjà en UTC (cas courant depuis Mongo) : inutile de passer par astimezone
+        return dt.replace(tzinfo=None)
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
 
 
 # Fonctions pour maintenir la compatibilité avec le code existant
-async def calculate_progress(tasks: List[Task]) -> float:
+def calculate_progress(tasks: List[Task]) -> float:
     """Alias pour la compatibilité - calcule le progrès moyen."""
-    return await calculate_average_progress(tasks)
+    return calculate_average_progress(tasks)
 
 
-async def calculate_total_time(tasks: List[Task]) -> float:
+def calculate_total_time(tasks: List[Task]) -> float:
     """Alias pour la compatibilité."""
-    return await calculate_total_time_in_days(tasks)
+    return calculate_total_time_in_days(tasks)
 
 
-async def calculate_transversal_time(activities: List[SprintTransversalActivity]) -> float:
+def calculate_transversal_time(activities: List[SprintTransversalActivity]) -> float:
     """Alias pour la compatibilité."""
-    return await calculate_transversal_time_in_days(activities)
+    return calculate_transversal_time_in_days(activities)
 
 
-async def calculate_otd(status: SprintStatus, velocity: float, in_scope: float) -> float:
+def calculate_otd(status: SprintStatus, velocity: float, in_scope: float) -> float:
     """
     DEPRECATED: Ancienne fonction OTD basée sur la vélocité.
     Maintenue pour compatibilité mais utilise le nouveau calcul.
@@ -304,9 +407,9 @@ async def calculate_otd(status: SprintStatus, velocity: float, in_scope: float)
     return (velocity / in_scope) * 100
 
 
-async def calculate_oqd(sprint_name: str, status: SprintStatus, tasks: List[Task]) -> float:
+def calculate_oqd(sprint_name: str, status: SprintStatus, tasks: List[Task]) -> float:
     """Alias pour la compatibilité - calcule le RFT."""
-    return await calculate_rft_percentage(status, tasks)
+    return calculate_rft_percentage(status, tasks)
 
 
 def date_convertion(start_date: datetime, due_date: datetime) -> tuple:
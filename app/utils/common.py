@@ -1,30 +1,52 @@
 """Common utility functions."""
 
+import logging
+import re
 from typing import Any, Dict, Optional
 from bson import ObjectId
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+_OID_RE = re.compile(r"[0-9a-fA-F]{24}")
+
 
 def convert_objectid_to_str(data: Any) -> Any:
-    """Convert ObjectId fields to strings recursively."""
+    """Convert ObjectId fields to strings recursively.
+
+    Dicts and lists are converted in place, using an explicit stack instead of recursion.
+    """
     if isinstance(data, ObjectId):
         return str(data)
-    elif isinstance(data, dict):
-        return {key: convert_objectid_to_str(value) for key, value in data.items()}
-    elif isinstance(data, list):
-        return [convert_objectid_to_str(item) for item in data]
-    else:
-        return data
+
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            items = node.items()
+        elif isinstance(node, list):
+            items = enumerate(node)
+        else:
+            continue
+
+        for key, value in items:
+            if isinstance(value, ObjectId):
+                node[key] = str(value)
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
+
+    return data
 
 
 def validate_objectid(object_id: str) -> bool:
     """Validate if string is a valid ObjectId."""
-    try:
-        ObjectId(object_id)
+    if isinstance(object_id, ObjectId):
+        return True
+    # Any 24-character hex string is a valid ObjectId, no need to build one
+    if isinstance(object_id, str) and _OID_RE.fullmatch(object_id):
         return True
-    except Exception as e:
-        print(str(e))
-        return False
+    logger.debug("Invalid ObjectId: %r", object_id)
+    return False
 
 
 def create_pagination_metadata(
@@ -33,14 +55,14 @@ def create_pagination_metadata(
         size: int
 ) -> Dict[str, Any]:
     """Create pagination metadata."""
-    from math import ceil
+    pages = (total + size - 1) // size if total > 0 else 0
 
     return {
         "total": total,
         "page": page,
         "size": size,
-        "pages": ceil(total / size) if total > 0 else 0,
-        "has_next": page * size < total,
+        "pages": pages,
+        "has_next": page < pages,
         "has_prev": page > 1
     }
 
@@ -1,17 +1,60 @@
-from io import StringIO
-from typing import List, Tuple
+import mmap
+import re
+from functools import lru_cache
+from io import BytesIO
+from typing import Iterable, Iterator, List, Set, Tuple, Union
 
 import pandas as pd
 from bson import ObjectId
 from bson.errors import InvalidId
 from fastapi import HTTPException, UploadFile
 from odmantic import AIOEngine
+from pymongo.errors import BulkWriteError
 
-from app.models.task import TaskStatus, TaskType, Task, ImportCSVResponse, SourceType, EXPECTED_HEADERS
+from app.models.task import Task, TaskStatus, TaskType, ImportCSVResponse, SourceType, EXPECTED_HEADERS
 from app.core.exceptions import raise_invalid_id_exception
 
 CANDIDATE_SEPS = [",", ";", "\t"]
 
+# Number of CSV rows parsed, mapped and inserted at a time
+CSV_CHUNK_SIZE = 50_000
+
+_NON_BLANK = re.compile(rb"\S")
+
+# Longest header line whose detection result is cached
+MAX_CACHED_HEADER_LENGTH = 4096
+
+# Required headers of each source type, checked in order (Jira first)
+EXPECTED_HEADER_SETS = {source_type: frozenset(headers) for source_type, headers in EXPECTED_HEADERS.items()}
+
+STATUS_MAPPING = {
+    'open': 'OPEN',
+    'to do': 'TODO',
+    'todo': 'TODO',
+    'in progress': 'PROG',
+    'done': 'DONE',
+    'ready for validation': 'REV',
+    'under investigation': 'INVEST',
+    'waiting for customer': 'CUST',
+    'standby': 'STANDBY',
+    'cancelled': 'CANCEL',
+    'postponed': 'POST'
+}
+
+# Type mapping using enum IDs (uppercase versions)
+TYPE_MAPPING = {
+    'bug': 'BUG',
+    'task': 'TASK',
+    'story': 'STORY',
+    'epic': 'EPIC',
+    'doc': 'DOC',
+    'test': 'TEST',
+    'deliverable': 'DELIVERABLE'
+}
+
+# Task fields coerced by map_csv_to_tasks, the only ones that can be inserted without Task validation
+COERCED_TASK_FIELDS = frozenset({'key', 'summary', 'type', 'storyPoints', 'status'})
+
 
 def detect_type_and_sep(first_line: str) -> (SourceType, str):
     """Detect the CSV separator by analyzing the first non-empty line.
@@ -26,50 +69,83 @@ def detect_type_and_sep(first_line: str) -> (SourceType, str):
         HTTPException: If no separator can be determined.
     """
     try:
-        for sep in CANDIDATE_SEPS:
-            cols = [c.strip() for c in first_line.split(sep)]
-            if set(EXPECTED_HEADERS[SourceType.JIRA]).issubset(cols):
-                return SourceType.JIRA, sep
-            if set(EXPECTED_HEADERS[SourceType.GITLAB]).issubset(cols):
-                return SourceType.GITLAB, sep
-        raise ValueError("Couldn't find expected headers in file")
+        # Exports from the same tool share their header line, only cache header-sized lines
+        if len(first_line) <= MAX_CACHED_HEADER_LENGTH:
+            return _detect_type_and_sep_cached(first_line)
+        return _detect_type_and_sep(first_line)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error detecting CSV separator: {str(e)}")
 
 
-def analyse_csv(content: bytes) -> (pd.DataFrame, SourceType):
-    lines = bytes_to_str(content)
-    source_type, separator = detect_type_and_sep(lines[0])
-    return parse_csv(lines, separator), source_type
+def _detect_type_and_sep(first_line: str) -> (SourceType, str):
+    """Find the source type and separator of a header line, raise ValueError if none matches."""
+    # Most frequent separator first (ties keep the CANDIDATE_SEPS order), absent ones can't match
+    counts = {sep: first_line.count(sep) for sep in CANDIDATE_SEPS}
+    for sep in sorted((sep for sep in CANDIDATE_SEPS if counts[sep]), key=counts.get, reverse=True):
+        cols = {c.strip() for c in first_line.split(sep)}
+        for source_type, headers in EXPECTED_HEADER_SETS.items():
+            if headers <= cols:
+                return source_type, sep
+    raise ValueError("Couldn't find expected headers in file")
+
+
+_detect_type_and_sep_cached = lru_cache(maxsize=256)(_detect_type_and_sep)
+
+
+async def read_upload(file: UploadFile) -> Union[bytes, mmap.mmap]:
+    """Get the content of an uploaded CSV file without buffering large uploads in memory.
+
+    Starlette spools uploads bigger than its threshold to a temporary file: that file is
+    memory-mapped so the OS pages it in on demand. Small in-memory uploads are read as bytes.
+
+    Args:
+        file (UploadFile): The uploaded CSV file.
+
+    Returns:
+        Union[bytes, mmap.mmap]: The raw content of the CSV file, a mmap must be closed by the caller.
+    """
+    spool = file.file
+    # SpooledTemporaryFile has no public rollover flag (its fileno() would force the rollover),
+    # any other file object falls back to an in-memory read
+    if getattr(spool, "_rolled", False):
+        spool.flush()
+        return mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ)
+    return await file.read()
+
+
+def analyse_csv(content: Union[bytes, mmap.mmap]) -> (Iterator[pd.DataFrame], SourceType):
+    source_type, separator = detect_type_and_sep(read_header_line(content))
+    return parse_csv(content, separator), source_type
+
 
+def read_header_line(content: Union[bytes, mmap.mmap]) -> str:
+    """Decode the first line of the CSV content, without its quotes, to detect the separator.
 
-def bytes_to_str(content: bytes) -> list[str]:
-    """Clean the CSV content by removing surrounding quotes and trailing commas, and split
-       the content into lists of str
+    Only the header is decoded here, the whole content is handed to pandas as bytes.
 
     Args:
-        content (bytes): The raw bytes of the CSV file.
+        content (Union[bytes, mmap.mmap]): The raw content of the CSV file.
 
     Returns:
-        list[str]: The cleaned CSV content
+        str: The cleaned first line of the CSV content
 
     Raises:
-        HTTPException: If the input is empty or contains no valid lines.
+        HTTPException: If the input is empty.
     """
     try:
-        text = content.decode('utf-8', errors='ignore')
-        if not text.strip():
+        if not _NON_BLANK.search(content):
             raise ValueError("Empty CSV content")
 
-        lines = text.splitlines()
+        end = content.find(b"\n", 0)
+        header = content[:end if end >= 0 else len(content)].decode('utf-8-sig', errors='ignore')
     except Exception as e:
         # logger.error(f"Error cleaning CSV: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Error cleaning CSV: {str(e)}")
 
     else:
-        lines = [l.replace("\r\n", "\n").replace("\r", "\n").replace("\"", "") for l in lines]
-        lines = [l.lstrip("\ufeff") for l in lines]
-        return lines
+        # splitlines also handles files with \r only line endings
+        lines = header.replace("\"", "").splitlines()
+        return lines[0] if lines else ""
 
 
 def validate_file_and_ids(file: UploadFile, sprint_id: str, project_id: str) -> Tuple[ObjectId, ObjectId] or None:
@@ -94,26 +170,32 @@ def validate_file_and_ids(file: UploadFile, sprint_id: str, project_id: str) ->
         raise_invalid_id_exception("Sprint or Project", f"{sprint_id} or {project_id}")
 
 
-def parse_csv(lines: list[str], separator: str) -> pd.DataFrame:
-    """Parse CSV content into a pandas DataFrame.
+def parse_csv(content: Union[bytes, mmap.mmap], separator: str) -> Iterator[pd.DataFrame]:
+    """Parse CSV content into pandas DataFrames of at most CSV_CHUNK_SIZE rows.
 
     Args:
-        lines (list[str]): The content of the csv file split in lines
+        content (Union[bytes, mmap.mmap]): The raw content of the CSV file.
         separator (str): The separator used in the CSV (e.g., ',' or ';').
 
-    Returns:
-        pd.DataFrame: The parsed DataFrame containing CSV data.
+    Yields:
+        pd.DataFrame: The parsed chunks containing CSV data.
 
     Raises:
         HTTPException: If parsing fails or the CSV is empty.
     """
-    lines = "\n".join(lines)
     try:
-        df = pd.read_csv(StringIO(lines), delimiter=separator)
-        if df.empty:
+        # A memory-mapped file is read by pandas directly, bytes need a file-like wrapper
+        buffer = content if isinstance(content, mmap.mmap) else BytesIO(content)
+        is_empty = True
+        with pd.read_csv(buffer, delimiter=separator, encoding='utf-8-sig', encoding_errors='ignore',
+                         chunksize=CSV_CHUNK_SIZE) as reader:
+            for df in reader:
+                if df.empty:
+                    continue
+                is_empty = False
+                yield df
+        if is_empty:
             raise HTTPException(status_code=400, detail="CSV file is empty")  # pragma: no cover
-        df = df.replace('""', '')
-        return df
     except Exception as e:
         # logger.error(f"Error parsing CSV: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Error parsing CSV: {str(e)}")
@@ -147,148 +229,188 @@ def validate_headers(df: pd.DataFrame, expected_headers: List[str]) -> pd.DataFr
         raise HTTPException(status_code=400, detail=f"Column '{str(e)}' missing from CSV")  # pragma: no cover
 
 
-def map_csv_to_tasks(df: pd.DataFrame, db_mapping: dict, sprint_id: ObjectId, project_id: ObjectId) -> pd.DataFrame:
+def map_csv_to_tasks(df: pd.DataFrame, db_mapping: dict) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """Map a CSV DataFrame to a format compatible with the Task model.
 
+    The sprint and project IDs are the same for every row, they are added to the tasks on insertion.
+
     Args:
         df (pd.DataFrame): The DataFrame containing CSV data.
         db_mapping (dict): A mapping of CSV headers to Task model field names.
-        sprint_id (ObjectId): The sprint ID to assign to tasks.
-        project_id (ObjectId): The project ID to assign to tasks.
 
     Returns:
-        pd.DataFrame: A DataFrame with mapped columns and filtered valid rows.
+        Tuple[pd.DataFrame, pd.DataFrame]: The mapped valid rows, and the CSV rows missing a key or summary.
 
     Raises:
         HTTPException: If mapping fails due to data issues.
     """
     try:
         mapped_df = df.rename(columns={h: db_mapping[h] for h in df.columns if h in db_mapping})
+        invalid_mask = mapped_df['key'].isna() | mapped_df['summary'].isna()
         mapped_df['key'] = mapped_df['key'].astype(str)
 
-        status_mapping = {
-            'open': 'OPEN',
-            'to do': 'TODO',
-            'todo': 'TODO',
-            'in progress': 'PROG',
-            'done': 'DONE',
-            'ready for validation': 'REV',
-            'under investigation': 'INVEST',
-            'waiting for customer': 'CUST',
-            'standby': 'STANDBY',
-            'cancelled': 'CANCEL',
-            'postponed': 'POST'
-        }
-
-        # Type mapping using enum IDs (uppercase versions)
-        type_mapping = {
-            'bug': 'BUG',
-            'task': 'TASK',
-            'story': 'STORY',
-            'epic': 'EPIC',
-            'doc': 'DOC',
-            'test': 'TEST',
-            'deliverable': 'DELIVERABLE'
-        }
-
+        # Missing values become 'nan' and fall back to the default like unknown labels
         if 'type' in mapped_df.columns:
-            mapped_df['type'] = mapped_df['type'].apply(
-                lambda x: type_mapping.get(str(x).lower(), 'TASK') if pd.notna(x) else 'TASK'
-            )
+            # The enum members are set after fillna, which would turn them back into plain strings
+            mapped_df['type'] = mapped_df['type'].astype(str).str.lower().map(TYPE_MAPPING).fillna('TASK').map(TaskType)
         else:
-            mapped_df['type'] = 'TASK'
+            mapped_df['type'] = TaskType.TASK
 
         if 'storyPoints' in mapped_df.columns:
-            mapped_df['storyPoints'] = pd.to_numeric(mapped_df['storyPoints'], errors='coerce').fillna(0)
+            mapped_df['storyPoints'] = pd.to_numeric(mapped_df['storyPoints'], errors='coerce').fillna(0).astype(float)
         else:
-            mapped_df['storyPoints'] = 0
+            mapped_df['storyPoints'] = 0.0
 
         # if 'assignee' in mapped_df.columns:
         #     mapped_df['assignee'] = mapped_df['assignee'].apply(lambda x: x if isinstance(x, str) else "")
         # else:
         #     mapped_df['assignee'] = [[] for _ in range(len(mapped_df))]
-        mapped_df['assignee'] = [[] for _ in range(len(mapped_df))]
 
         # Handle status column: if missing, fill with To do; otherwise, map values
         if 'status' in mapped_df.columns:
-            mapped_df['status'] = mapped_df['status'].apply(
-                lambda x: status_mapping.get(str(x).lower(), 'TODO') if pd.notna(x) else 'TODO'
-            )
+            mapped_df['status'] = mapped_df['status'].astype(str).str.lower().map(STATUS_MAPPING).fillna('TODO').map(TaskStatus)
         else:
-            mapped_df['status'] = 'TODO'
-
-        mapped_df['sprintId'] = sprint_id
-        mapped_df['projectId'] = project_id
+            mapped_df['status'] = TaskStatus.TODO
 
-        return mapped_df[~mapped_df['key'].isna() & ~mapped_df['summary'].isna()]
+        # Only keep Task fields, the assignee is left to the Task default (one empty list per task)
+        columns = [c for c in mapped_df.columns if c in Task.model_fields and c != 'assignee']
+        return mapped_df.loc[~invalid_mask, columns], df.loc[invalid_mask]
     except Exception as e:  # pragma: no cover
         # logger.error(f"Error mapping data: {str(e)}") # pragma: no cover
         raise HTTPException(status_code=400, detail=f"Error mapping CSV data: {str(e)}")  # pragma: no cover
 
 
-async def process_tasks_and_duplicates(mapped_df: pd.DataFrame, sprint: "Sprint", engine: "AIOEngine") -> Tuple[
-    List[Task], int, List[str], pd.DataFrame]:
-    """Process tasks, handle duplicates, and save them to the database.
+async def process_tasks_and_duplicates(mapped_chunks: Iterable[Tuple[pd.DataFrame, pd.DataFrame]], sprint: "Sprint",
+                                      project_id: ObjectId, engine: "AIOEngine") -> Tuple[List[ObjectId], List[str], pd.DataFrame]:
+    """Process tasks chunk by chunk, handle duplicates, and save them to the database.
 
     Args:
-        mapped_df (pd.DataFrame): The DataFrame with mapped task data.
+        mapped_chunks (Iterable[Tuple[pd.DataFrame, pd.DataFrame]]): The mapped valid and invalid rows of each chunk.
         sprint (Task): The sprint object to update with task IDs.
+        project_id (ObjectId): The project ID to assign to tasks.
         engine (AIOEngine): The database engine for querying and saving.
 
     Returns:
-        Tuple[List[Task], int, List[str], pd.DataFrame]: A tuple containing:
-            - List of created Task objects.
-            - Total count of tasks in the database.
+        Tuple[List[ObjectId], List[str], pd.DataFrame]: A tuple containing:
+            - List of the created task IDs.
             - List of duplicate keys.
-            - DataFrame of invalid rows.
+            - DataFrame of the rows missing a key or summary.
 
     Raises:
-        HTTPException: If no valid rows remain or task creation fails.
+        HTTPException: If no valid rows remain or task creation fails. When tasks were already
+            imported, the error detail says how many.
     """
-    invalid_rows = mapped_df[mapped_df['key'].isna() | mapped_df['summary'].isna()]
-    if mapped_df.empty:
+    task_ids = []
+    duplicate_keys = []
+    invalid_chunks = []
+    # Keys inserted by the previous chunks, they are not duplicates of tasks already in the sprint
+    imported_keys = set()
+    sprint_task_count = len(sprint.task)
+    try:
+        for mapped_df, invalid_df in mapped_chunks:
+            if not invalid_df.empty:
+                invalid_chunks.append(invalid_df)
+            if mapped_df.empty:
+                continue
+
+            chunk_task_ids, chunk_duplicate_keys = await process_tasks_chunk(mapped_df, sprint, project_id,
+                                                                             imported_keys, engine)
+            task_ids.extend(chunk_task_ids)
+            duplicate_keys.extend(chunk_duplicate_keys)
+    except Exception as e:
+        imported_count = len(sprint.task) - sprint_task_count
+        if not imported_count:
+            raise
+        # Keep the sprint in line with the tasks already inserted, even if a later chunk fails
+        await engine.save(sprint)
+        if isinstance(e, HTTPException):
+            raise HTTPException(
+                status_code=e.status_code,
+                detail=f"{e.detail}. Partial import: {imported_count} tasks were imported before the error"
+            ) from e
+        raise
+
+    if not task_ids and not duplicate_keys:
         raise HTTPException(status_code=400, detail="No valid rows after filtering")
 
-    existing_tasks = await engine.find(Task, Task.sprintId == mapped_df['sprintId'].iloc[0], Task.is_deleted == False)
-    existing_keys = {task.key for task in existing_tasks}
-    all_keys = mapped_df['key'].tolist()
-    duplicate_keys = [key for key in all_keys if key in existing_keys]
+    if task_ids:
+        await engine.save(sprint)
+    invalid_rows = pd.concat(invalid_chunks) if invalid_chunks else pd.DataFrame()
+    return task_ids, duplicate_keys, invalid_rows
 
-    new_tasks_df = mapped_df[~mapped_df['key'].isin(existing_keys)]
-    try:
-        # Convert enum string IDs to actual enum values before creating Task objects
-        tasks = []
-        for _, row in new_tasks_df.iterrows():
-            task_dict = row.to_dict()
 
-            # Convert status string to enum
-            if 'status' in task_dict:
-                task_dict['status'] = TaskStatus(task_dict['status'])
+async def process_tasks_chunk(mapped_df: pd.DataFrame, sprint: "Sprint", project_id: ObjectId,
+                              imported_keys: Set[str], engine: "AIOEngine") -> Tuple[List[ObjectId], List[str]]:
+    """Create and insert the tasks of one CSV chunk, skipping keys that already exist in the sprint.
 
-            # Convert type string to enum
-            if 'type' in task_dict:
-                task_dict['type'] = TaskType(task_dict['type'])
+    The IDs of the inserted tasks are added to the sprint task list, which is saved by the caller.
 
-            tasks.append(Task(**task_dict))
-    except Exception as e:
-        # logger.error(f"Error creating task objects: {str(e)}")
-        raise HTTPException(status_code=400, detail=f"Error creating tasks from CSV: {str(e)}")
+    Args:
+        mapped_df (pd.DataFrame): The DataFrame with mapped task data.
+        sprint (Sprint): The sprint object to update with task IDs.
+        project_id (ObjectId): The project ID to assign to tasks.
+        imported_keys (Set[str]): The keys inserted by the previous chunks, updated with this chunk's keys.
+        engine (AIOEngine): The database engine for querying and saving.
 
-    if tasks:
-        await engine.save_all(tasks)
-        sprint.task.extend([task.id for task in tasks])
-        await engine.save(sprint)
+    Returns:
+        Tuple[List[ObjectId], List[str]]: The created task IDs and the duplicate keys.
 
-    total_count = await engine.count(Task, Task.is_deleted == False)
-    return tasks, total_count, duplicate_keys, invalid_rows
+    Raises:
+        HTTPException: If task creation fails.
+        BulkWriteError: If some documents can't be inserted, the ones written are still added to the sprint.
+    """
+    # Only fetch the keys colliding with an incoming row, the index answers it without reading the tasks.
+    # Keys inserted by the previous chunks can't have been in the sprint before the import.
+    candidate_keys = [key for key in mapped_df['key'].unique().tolist() if key not in imported_keys]
+    existing_keys = set()
+    if candidate_keys:
+        cursor = engine.get_collection(Task).find(
+            {"sprintId": sprint.id, "is_deleted": False, "key": {"$in": candidate_keys}},
+            {"key": 1, "_id": 0}
+        )
+        existing_keys = {doc["key"] async for doc in cursor}
+    duplicate_mask = mapped_df['key'].isin(existing_keys)
+    duplicate_keys = mapped_df.loc[duplicate_mask, 'key'].tolist()
 
+    new_tasks_df = mapped_df.loc[~duplicate_mask]
+    records = new_tasks_df.to_dict(orient='records')
+    ids = {"sprintId": sprint.id, "projectId": project_id}
+    try:
+        # Any other Task field comes as is from the CSV, and the summary can still hold non-text values
+        if COERCED_TASK_FIELDS.issuperset(new_tasks_df.columns) and \
+                pd.api.types.infer_dtype(new_tasks_df['summary'], skipna=False) == 'string':
+            # Documents are built from the records without a Task round-trip, the fields missing
+            # from the CSV get the Task defaults (created_at is shared by the chunk)
+            defaults = {name: field.get_default(call_default_factory=True) for name, field in Task.model_fields.items()
+                        if name != 'id' and name not in ids and name not in new_tasks_df.columns}
+            docs = [{**record, **ids, **defaults, "_id": ObjectId()} for record in records]
+        else:
+            docs = [Task(**{**record, **ids}).model_dump_doc() for record in records]
+    except Exception as e:
+        # logger.error(f"Error creating task objects: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Error creating tasks from CSV: {str(e)}")
 
-def build_response(tasks: List[Task], duplicate_keys: List[str],
+    if docs:
+        try:
+            # save_all issues one upsert per task, a single insert_many is enough for new documents
+            await engine.get_collection(Task).insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            # Unordered inserts still write every document but the failing ones
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            sprint.task.extend(doc["_id"] for i, doc in enumerate(docs) if i not in failed)
+            raise
+        imported_keys.update(new_tasks_df['key'])
+    task_ids = [doc["_id"] for doc in docs]
+    sprint.task.extend(task_ids)
+    return task_ids, duplicate_keys
+
+
+def build_response(task_ids: List[ObjectId], duplicate_keys: List[str],
                    invalid_rows: pd.DataFrame) -> ImportCSVResponse:
     """Build the response object for the CSV import operation.
 
     Args:
-        tasks (List[Task]): The list of successfully imported tasks.
+        task_ids (List[ObjectId]): The IDs of the successfully imported tasks.
         duplicate_keys (List[str]): The list of keys that were duplicates.
         invalid_rows (pd.DataFrame): The DataFrame of rows with missing mandatory fields.
 
@@ -299,7 +421,7 @@ def build_response(tasks: List[Task], duplicate_keys: List[str],
     invalid_row_numbers = [idx + 2 for idx in invalid_rows.index] if invalid_row_count > 0 else []
     duplicate_count = len(duplicate_keys)
 
-    message = f"Successfully imported {len(tasks)} tasks"
+    message = f"Successfully imported {len(task_ids)} tasks"
     if invalid_row_count > 0:
         row_msg = f"row index number: {', '.join(map(str, invalid_row_numbers))}" if len(
             invalid_row_numbers) <= 10 else f"{invalid_row_count} rows"